@@ -2,13 +2,14 @@
 Video creation API endpoints
 """
 
+import asyncio
 import os
 import uuid
 import json
 import logging
 from filelock import FileLock
 from fastapi import APIRouter, File, UploadFile, HTTPException, BackgroundTasks
-from app.services.video_service import video_service
+from app.services.video_service import get_video_service
 from app.core.exceptions import FileValidationError
 from app.config.settings import settings
 
@@ -20,20 +21,28 @@ JOB_STORE_PATH = os.path.join("data", "job_store.json")
 JOB_STORE_LOCK_PATH = os.path.join("data", "job_store.json.lock")
 
 
-def load_job_store():
+def _read_job_store():
+    """Read the job store; the caller holds the lock"""
     if not os.path.exists(JOB_STORE_PATH):
         return {}
+    with open(JOB_STORE_PATH, "r", encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except Exception:
+            return {}
+
+
+def load_job_store():
     with FileLock(JOB_STORE_LOCK_PATH, timeout=5):
-        with open(JOB_STORE_PATH, "r", encoding="utf-8") as f:
-            try:
-                return json.load(f)
-            except Exception:
-                return {}
+        return _read_job_store()
 
 
-def save_job_store(job_store):
+def update_job(job_id, **fields):
+    """Create or update one job entry in a single locked read-modify-write"""
     os.makedirs(os.path.dirname(JOB_STORE_PATH), exist_ok=True)
     with FileLock(JOB_STORE_LOCK_PATH, timeout=5):
+        job_store = _read_job_store()
+        job_store.setdefault(job_id, {}).update(fields)
         with open(JOB_STORE_PATH, "w", encoding="utf-8") as f:
             json.dump(job_store, f)
 
@@ -51,11 +60,14 @@ async def validate_upload_file(file: UploadFile) -> None:
             file.filename,
         )
 
-    # Read file content to check size
-    content = await file.read()
-    await file.seek(0)  # Reset file pointer
+    # Starlette records the spooled upload's size; only read (at most one
+    # byte past the limit) when it is unknown
+    size = file.size
+    if size is None:
+        size = len(await file.read(settings.max_file_size + 1))
+        await file.seek(0)  # Reset file pointer
 
-    if len(content) > settings.max_file_size:
+    if size > settings.max_file_size:
         raise FileValidationError(
             f"File too large. Max size: {settings.max_file_size} bytes", file.filename
         )
@@ -71,11 +83,14 @@ async def create_video(
     Returns: {"job_id": ...}
     """
     job_id = str(uuid.uuid4())
-    content = await file.read()
+    # One byte past the limit is enough for the size check in process_job,
+    # so an oversized upload is never read into memory in full
+    content = await file.read(settings.max_file_size + 1)
     filename = file.filename
-    job_store = load_job_store()
-    job_store[job_id] = {"status": "pending", "result": None, "error": None}
-    save_job_store(job_store)
+    # The job store is a locked JSON file: keep its I/O off the event loop
+    await asyncio.to_thread(
+        update_job, job_id, status="pending", result=None, error=None
+    )
 
     async def process_job(content, filename):
         try:
@@ -97,18 +112,18 @@ async def create_video(
             json_data = json.loads(content.decode("utf-8"))
             if not isinstance(json_data, dict) or "segments" not in json_data:
                 raise ValueError("Invalid JSON format: 'segments' key is required")
-            result = await video_service.create_video_from_json(json_data)
-            job_store = load_job_store()
-            job_store[job_id]["status"] = "done"
-            job_store[job_id]["result"] = result[
-                "s3_url"
-            ]  # Use S3 URL instead of local path
-            save_job_store(job_store)
+            result = await get_video_service().create_video_from_json(json_data)
+            # Use S3 URL instead of local path unless the upload was disabled
+            await asyncio.to_thread(
+                update_job,
+                job_id,
+                status="done",
+                result=result["s3_url"] or result["video_path"],
+            )
         except Exception as e:
-            job_store = load_job_store()
-            job_store[job_id]["status"] = "failed"
-            job_store[job_id]["error"] = str(e)
-            save_job_store(job_store)
+            await asyncio.to_thread(
+                update_job, job_id, status="failed", error=str(e)
+            )
 
     background_tasks.add_task(process_job, content, filename)
     return {"job_id": job_id}
@@ -116,7 +131,7 @@ async def create_video(
 
 @router.get("/status/{job_id}")
 async def get_job_status(job_id: str):
-    job_store = load_job_store()
+    job_store = await asyncio.to_thread(load_job_store)
     job = job_store.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail={"error": "Job not found"})
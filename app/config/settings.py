@@ -75,6 +75,8 @@ class Settings(BaseSettings):
     # Video Processing Settings
     video_default_fps: int = 24
     video_default_codec: str = "libx264"
+    video_hw_encoding_enabled: bool = True  # Use h264_nvenc when a working NVIDIA GPU is found
+    video_hw_max_sessions: int = 3  # Concurrent NVENC encodes (consumer GPU session limit)
     video_default_audio_codec: str = "aac"
     video_default_resolution: str = "1920,1080"
     
@@ -124,6 +126,14 @@ class Settings(BaseSettings):
     # Download Settings
     download_timeout: int = 300  # 5 minutes for large video files
     download_max_concurrent: int = 10
+    download_global_max_concurrent: int = 32  # In-flight transfers across all jobs
+    download_pool_limit: int = 64  # Shared HTTP connection pool size
+    download_pool_limit_per_host: int = 16  # Most assets come from a few CDN hosts
+    media_probe_max_concurrent: int = 16  # Parallel ffprobe runs after downloads
+    asset_cache_enabled: bool = True  # Reuse downloaded assets across jobs by URL
+    asset_cache_dir: str = "data/asset_cache"
+    asset_cache_max_mb: int = 2048  # Least recently used files are evicted above this
+    asset_cache_max_age_hours: float = 24.0  # Re-download entries older than this (URL content can change)
     download_retry_attempts: int = 3
 
     # Temp Directory Settings
@@ -133,15 +143,16 @@ class Settings(BaseSettings):
     temp_cleanup_retry_attempts: int = 3
     temp_cleanup_retry_delay: float = 2.0
     temp_delayed_cleanup_delay: float = 30.0
+    temp_cleanup_interval_seconds: float = 3600.0  # 0 = only once at startup
 
     # Video Output Settings
     output_directory: str = "data/output"
 
     # Performance Settings
-    performance_gc_enabled: bool = True
-    performance_file_handle_delay: float = 1.0
     performance_max_memory_mb: int = 2048
-    performance_max_concurrent_segments: int = 1
+    performance_max_concurrent_segments: int = 0  # 0 = os.cpu_count()
+    pipeline_prefetch_segments: int = 2  # Prepared segments queued ahead of rendering
+    pipeline_prepare_concurrency: int = 2  # Segments prepared (aligned) at once
 
     # Security Settings
     request_timeout: int = 300  # 5 minutes
@@ -154,6 +165,9 @@ class Settings(BaseSettings):
     # AI Pydantic Settings
     ai_pydantic_enabled: bool = True
     ai_pydantic_model: str = "gpt-4.1-nano"
+    transcript_split_cache_enabled: bool = True  # Reuse LLM splits of identical transcripts
+    transcript_split_cache_dir: str = "data/transcript_cache"
+    transcript_split_cache_max_age_days: float = 30.0  # Janitor drops entries unused this long
 
     # OpenAI API Key
     openai_api_key: str = ""
@@ -202,6 +216,20 @@ class Settings(BaseSettings):
                 pass
         return (1920, 1080)  # Default fallback
 
+    @property
+    def segment_clip_concurrency(self) -> int:
+        """Get the number of segment clips rendered concurrently"""
+        if self.performance_max_concurrent_segments > 0:
+            return self.performance_max_concurrent_segments
+        return os.cpu_count() or 1
+
+    @property
+    def ffmpeg_segment_threads(self) -> int:
+        """Get encoder threads per segment clip so concurrent renders share the CPUs"""
+        if self.ffmpeg_threads > 0:
+            return self.ffmpeg_threads
+        return max(1, (os.cpu_count() or 1) // self.segment_clip_concurrency)
+
     @field_validator("video_default_resolution")
     @classmethod
     def parse_resolution(cls, v):
@@ -4,7 +4,7 @@ Custom middleware for rate limiting and security
 
 import time
 from collections import defaultdict, deque
-from fastapi import Request, HTTPException
+from fastapi import Request
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 import logging
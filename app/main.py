@@ -25,6 +25,8 @@ from app.core.middleware import (
     RequestLoggingMiddleware,
 )
 from app.api.v1.router import router as api_v1_router
+from app.services.video_service import get_video_service
+from utils.download_utils import close_http_session
 
 # Configure logging: both to console and to file
 log_handlers = [
@@ -48,8 +50,11 @@ async def lifespan(app: FastAPI):
     """Application lifespan management"""
     logger.info("Starting Video Creation API...")
     logger.info(f"Debug mode: {settings.debug}")
+    await get_video_service().warmup()
     yield
     logger.info("Shutting down Video Creation API...")
+    await get_video_service().shutdown()
+    await close_http_session()
 
 
 def create_application() -> FastAPI:
@@ -24,6 +24,7 @@ class PipelineContext(IPipelineContext):
     temp_dir: Optional[Path] = None
     video_id: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    num_segments: int = 0
 
     def __post_init__(self):
         """Initialize after dataclass sets the attributes."""
@@ -49,8 +50,8 @@ class PipelineContext(IPipelineContext):
         """
         if value is not None:
             self._temp_dir = Path(value)
-            if not self._temp_dir.exists():
-                self._temp_dir.mkdir(parents=True, exist_ok=True)
+            # exist_ok makes a separate exists() check redundant
+            self._temp_dir.mkdir(parents=True, exist_ok=True)
         else:
             self._temp_dir = None
 
@@ -67,6 +68,15 @@ class PipelineContext(IPipelineContext):
         """
         return self.data.get(key, default)
 
+    def __getitem__(self, key: str) -> Any:
+        """
+        Get a required value from the context data.
+
+        Raises:
+            KeyError: If the key is not present
+        """
+        return self.data[key]
+
     def set(self, key: str, value: Any) -> None:
         """
         Set a value in the context data.
@@ -31,34 +31,17 @@ def get_video_creation_stages() -> List[Dict[str, Any]]:
             "output_key": "download_results",
             "required_inputs": ["validated_data"],
         },
-        # Stage 3: Image auto processing
+        # Stage 3: Prepare segments (image auto + transcript) and render clips,
+        # overlapping preparation of the next segment with rendering
         {
             "type": "processor",
-            "name": "image_auto",
-            "processor_class": "app.services.processors.media.ImageProcessor",
+            "name": "prepare_and_render_segments",
+            "processor_class": "app.services.processors.workflow.SegmentStreamProcessor",
             "input_key": "download_results",
-            "output_key": "processed_segments",
-            "required_inputs": ["download_results"],
-        },
-        # Stage 4: Transcript alignment
-        {
-            "type": "processor",
-            "name": "transcript_alignment",
-            "processor_class": "app.services.processors.text.TranscriptProcessor",
-            "input_key": "processed_segments",
-            "output_key": "processed_segments",
-            "required_inputs": ["processed_segments"],
-        },
-        # Stage 5: Create segment clips
-        {
-            "type": "processor",
-            "name": "create_segment_clips",
-            "processor_class": "app.services.processors.media.VideoProcessor",
-            "input_key": "processed_segments",
             "output_key": "segment_clips",
-            "required_inputs": ["processed_segments"],
+            "required_inputs": ["download_results"],
         },
-        # Stage 6: Concatenate video segments
+        # Stage 4: Concatenate video segments
         {
             "type": "processor",
             "name": "concatenate_video",
@@ -67,7 +50,7 @@ def get_video_creation_stages() -> List[Dict[str, Any]]:
             "output_key": "final_video_path",
             "required_inputs": ["segment_clips", "transitions", "background_music"],
         },
-        # Stage 7: Upload to S3
+        # Stage 5: Upload to S3
         {
             "type": "processor",
             "name": "upload",
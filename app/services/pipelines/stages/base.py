@@ -75,9 +75,8 @@ class BasePipelineStage(IPipelineStage, ABC):
         try:
             # Validate inputs before execution
             if not self.validate_inputs(context):
-                missing = [
-                    key for key in self.required_inputs if key not in context.data
-                ]
+                data = context.data
+                missing = [key for key in self.required_inputs if key not in data]
                 raise ProcessingError(f"Missing required inputs: {', '.join(missing)}")
 
             # Check if stage can be skipped
@@ -128,7 +127,8 @@ class BasePipelineStage(IPipelineStage, ABC):
         if not self.required_inputs:
             return True
 
-        return all(key in context.data for key in self.required_inputs)
+        data = context.data
+        return all(key in data for key in self.required_inputs)
 
     def can_skip(self, context: IPipelineContext) -> bool:
         """
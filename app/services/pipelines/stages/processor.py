@@ -50,10 +50,10 @@ class ProcessorPipelineStage(BasePipelineStage):
         self.input_key = input_key
         self.output_key = output_key
 
-        # Log processor type for debugging
-        is_async = asyncio.iscoroutinefunction(processor.process)
+        # Resolve the processor type once instead of on every execution
+        self._is_async = asyncio.iscoroutinefunction(processor.process)
         self.logger.debug(
-            "Initialized %s processor stage", "async" if is_async else "sync"
+            "Initialized %s processor stage", "async" if self._is_async else "sync"
         )
 
     async def _execute_impl(self, context: IPipelineContext) -> IPipelineContext:
@@ -82,7 +82,7 @@ class ProcessorPipelineStage(BasePipelineStage):
             self.logger.debug("Input data type: %s", type(input_data).__name__)
 
             # Execute processor (sync or async)
-            if asyncio.iscoroutinefunction(self.processor.process):
+            if self._is_async:
                 self.logger.debug("Executing async processor")
                 result = await self.processor.process(input_data, **kwargs)
             else:
@@ -100,6 +100,8 @@ def _add_processor_stage(pipeline: VideoPipeline, config: Dict[str, Any]) -> Non
     """
     processor_class = _import_class(config["processor_class"])
     processor = processor_class()
+    # Report processor metrics to the pipeline's collector
+    processor.metrics_collector = pipeline.metrics_collector
 
     pipeline.add_processor_stage(
         name=config["name"],
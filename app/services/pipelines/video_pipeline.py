@@ -180,19 +180,14 @@ class VideoPipeline(IPipeline):
 
                 try:
                     # Execute the stage
-                    self.logger.info("Executing stage: %s", stage.name)
+                    self.logger.debug("Executing stage: %s", stage.name)
                     context = await stage.execute(context)
 
-                    # Record successful execution
+                    # Record successful execution; per-stage timings are
+                    # reported together in the completion summary below
                     stage_result["status"] = stage.status.value
                     stage_result["duration"] = time.time() - stage_start
 
-                    self.logger.info(
-                        "Completed stage %s in %.2fs",
-                        stage.name,
-                        stage_result["duration"],
-                    )
-
                 except Exception as e:
                     # Record stage failure
                     stage_result["status"] = "failed"
@@ -213,9 +208,15 @@ class VideoPipeline(IPipeline):
             results["context"] = context
             results["duration"] = time.time() - start_time
             results["success"] = True
-            self.logger.info(
-                "Pipeline completed successfully in %.2f seconds", results["duration"]
-            )
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(
+                    "Pipeline completed successfully in %.2f seconds (%s)",
+                    results["duration"],
+                    ", ".join(
+                        f"{stage_result['name']}={stage_result['duration']:.2f}s"
+                        for stage_result in results["stages"]
+                    ),
+                )
 
             return results
 
@@ -38,6 +38,10 @@ from .text.transcript import TranscriptProcessor
 # Validation
 from .validation.processor import ValidationProcessor
 
+# Workflow
+from .workflow.prepare import SegmentPreparationProcessor
+from .workflow.stream import SegmentStreamProcessor
+
 __all__ = [
     # Core - New classes
     "ProcessorBase",
@@ -58,4 +62,7 @@ __all__ = [
     "TranscriptProcessor",
     # Validation
     "ValidationProcessor",
+    # Workflow
+    "SegmentPreparationProcessor",
+    "SegmentStreamProcessor",
 ]
@@ -1,7 +1,7 @@
 """Abstract base classes for video processing components"""
 
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 import logging
 
 from .metrics import MetricsCollector, ProcessingMetrics, ProcessingStage
@@ -22,9 +22,26 @@ class ProcessorBase(ABC):
         Args:
             metrics_collector: Optional metrics collector. If None, creates a new one.
         """
-        self.metrics_collector = metrics_collector or MetricsCollector()
+        self._metrics_collector = metrics_collector or MetricsCollector()
         self.logger = logging.getLogger(self.__class__.__name__)
 
+    @property
+    def metrics_collector(self) -> MetricsCollector:
+        """Collector this processor (and the processors it delegates to) reports to"""
+        return self._metrics_collector
+
+    @metrics_collector.setter
+    def metrics_collector(self, collector: MetricsCollector) -> None:
+        # The pipeline rebinds stage processors to its collector after
+        # construction; nested processors must follow or their stages are lost
+        self._metrics_collector = collector
+        for child in self._child_processors():
+            child.metrics_collector = collector
+
+    def _child_processors(self) -> Iterable["ProcessorBase"]:
+        """Processors this one delegates to (composite processors override this)"""
+        return ()
+
     def _start_processing(self, stage: ProcessingStage) -> ProcessingMetrics:
         """Start processing with metrics tracking.
 
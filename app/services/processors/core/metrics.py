@@ -29,13 +29,17 @@ class ProcessingStage(Enum):
     UPLOAD = "upload"
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessingMetrics:
-    """Metrics for processing operations"""
+    """Metrics for processing operations.
+
+    Timestamps are monotonic ``time.perf_counter_ns()`` readings; they are only
+    converted to seconds when a duration is requested.
+    """
 
     stage: ProcessingStage
-    start_time: float
-    end_time: Optional[float] = None
+    start_time_ns: int
+    end_time_ns: Optional[int] = None
     success: bool = True
     error_message: Optional[str] = None
     items_processed: int = 0
@@ -43,9 +47,10 @@ class ProcessingMetrics:
     @property
     def duration(self) -> float:
         """Get processing duration in seconds"""
-        if self.end_time is None:
-            return time.time() - self.start_time
-        return self.end_time - self.start_time
+        end_time_ns = self.end_time_ns
+        if end_time_ns is None:
+            end_time_ns = time.perf_counter_ns()
+        return (end_time_ns - self.start_time_ns) / 1e9
 
 
 class MetricsCollector:
@@ -57,10 +62,15 @@ class MetricsCollector:
 
     def start_stage(self, stage: ProcessingStage) -> ProcessingMetrics:
         """Start tracking a processing stage"""
-        metric = ProcessingMetrics(stage=stage, start_time=time.time())
+        metric = ProcessingMetrics(stage=stage, start_time_ns=time.perf_counter_ns())
         self.metrics.append(metric)
         return metric
 
+    def reset(self) -> None:
+        """Clear collected metrics and counters so the collector can be reused"""
+        self.metrics.clear()
+        self._counters.clear()
+
     def increment_counter(self, name: str, value: int = 1) -> None:
         """Increment a counter metric.
 
@@ -103,7 +113,7 @@ class MetricsCollector:
         items_processed: int = 0,
     ) -> None:
         """End tracking a processing stage"""
-        metric.end_time = time.time()
+        metric.end_time_ns = time.perf_counter_ns()
         metric.success = success
         metric.error_message = error_message
         metric.items_processed = items_processed
@@ -121,9 +131,10 @@ class MetricsCollector:
         if not self.metrics:
             return 0.0
 
-        start_time = min(m.start_time for m in self.metrics)
-        end_time = max(m.end_time or time.time() for m in self.metrics)
-        return end_time - start_time
+        now_ns = time.perf_counter_ns()
+        start_time_ns = min(m.start_time_ns for m in self.metrics)
+        end_time_ns = max(m.end_time_ns or now_ns for m in self.metrics)
+        return (end_time_ns - start_time_ns) / 1e9
 
     def get_summary(self) -> Dict[str, Any]:
         """Get processing summary"""
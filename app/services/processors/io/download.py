@@ -4,16 +4,38 @@ Processor for downloading assets in the video creation pipeline.
 
 import asyncio
 import logging
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from app.core.exceptions import DownloadError
 from app.services.processors.core.base_processor import AsyncProcessor
 from app.config.settings import settings
-from utils.download_utils import download_file
+from utils.download_utils import download_file, normalize_url
+from utils.video_utils import probe_duration_async
 
 logger = logging.getLogger(__name__)
 
+# Asset có thời lượng được probe ngay sau khi tải xong
+_PROBED_ASSET_TYPES = ("video", "voice_over")
+
+# (asset_type, filename prefix) cho các asset của segment, tính một lần khi import
+_SEGMENT_ASSET_SPECS = tuple(settings.segment_asset_types.items())
+
+
+class _DownloadFailed(Exception):
+    """Raised by a download worker to stop its siblings after a failure"""
+
+
+@dataclass(slots=True, frozen=True)
+class DownloadRequest:
+    """A single asset download scheduled by DownloadProcessor"""
+
+    url: str
+    dest_path: str
+    asset_type: str
+    segment_id: str
+
 
 class DownloadProcessor(AsyncProcessor):
     """
@@ -49,10 +71,13 @@ class DownloadProcessor(AsyncProcessor):
         if not segments:
             raise DownloadError("Segments list cannot be empty")
 
-        # Prepare tasks for all downloads
-        download_tasks = []
+        # Prepare requests for all downloads; a URL used by several assets
+        # is downloaded once and every asset points at the same local file
+        download_requests: List[DownloadRequest] = []
+        dest_by_url: Dict[str, str] = {}
         results = []
-        result_background_music = {}
+
+        temp_path = Path(temp_dir)
 
         # Add segment downloads - Preserve original structure, add local_path to assets
         for i, segment in enumerate(segments):
@@ -62,29 +87,29 @@ class DownloadProcessor(AsyncProcessor):
                 )
 
             segment_id = segment.get("id", f"segment_{i}")
-            result_segment = segment.copy()
-            result_background_music = background_music.copy()
+            # Only asset entries change; other keys stay shared with the input
+            overrides: Dict[str, Any] = {}
 
-            # Get supported segment asset types from settings
-            asset_types = settings.segment_asset_types
-
-            for asset_type, prefix in asset_types.items():
-                if (
-                    asset_type in segment
-                    and isinstance(segment[asset_type], dict)
-                    and segment[asset_type].get("url")
-                ):
-                    asset_data = segment[asset_type]
-                    asset_url = asset_data["url"]
+            for asset_type, prefix in _SEGMENT_ASSET_SPECS:
+                asset_data = segment.get(asset_type)
+                if not isinstance(asset_data, dict):
+                    continue
+                asset_url = asset_data.get("url")
+                if not asset_url:
+                    continue
 
+                url_key = normalize_url(asset_url)
+                dest_path = dest_by_url.get(url_key)
+                if dest_path is None:
                     # Generate destination path - remove query parameters from URL
                     clean_url = asset_url.split('?')[0]  # Remove query parameters
                     dest_filename = f"{segment_id}_{prefix}_{Path(clean_url).name}"
-                    dest_path = str(Path(temp_dir) / dest_filename)
+                    dest_path = str(temp_path / dest_filename)
+                    dest_by_url[url_key] = dest_path
 
-                    # Add download task
-                    download_tasks.append(
-                        self._download_asset(
+                    # Add download request
+                    download_requests.append(
+                        DownloadRequest(
                             url=asset_url,
                             dest_path=dest_path,
                             asset_type=asset_type,
@@ -92,31 +117,33 @@ class DownloadProcessor(AsyncProcessor):
                         )
                     )
 
-                    # Add local_path to the original asset structure
-                    result_segment[asset_type] = asset_data.copy()
-                    result_segment[asset_type]["local_path"] = dest_path
+                # Add local_path to a copy of the original asset structure
+                result_asset = asset_data.copy()
+                result_asset["local_path"] = dest_path
+                overrides[asset_type] = result_asset
 
-            # Always add segment to results (preserve structure even if no assets)
-            results.append(result_segment)
+            # Always add segment to results (preserve structure even if no assets);
+            # build a merged dict only when some asset got a local path
+            results.append({**segment, **overrides} if overrides else segment)
 
         # Handle background music if provided
         if background_music is not None:
             if not isinstance(background_music, dict) or "url" not in background_music:
                 raise DownloadError("background_music must be an object with 'url' field")
 
-            # Clean up the background music URL by removing query parameters
-            bg_url = background_music['url'].split('?')[0]
-            bg_dest_path = str(
-                Path(temp_dir) / f"bg_music_{Path(bg_url).name}"
-            )
-            download_tasks.append(
-                self._download_asset(
-                    url=background_music["url"],
-                    dest_path=bg_dest_path,
-                    asset_type="background_music",
-                    segment_id="bg_music",
+            bg_dest_path = dest_by_url.get(normalize_url(background_music["url"]))
+            if bg_dest_path is None:
+                # Clean up the background music URL by removing query parameters
+                bg_url = background_music['url'].split('?')[0]
+                bg_dest_path = str(temp_path / f"bg_music_{Path(bg_url).name}")
+                download_requests.append(
+                    DownloadRequest(
+                        url=background_music["url"],
+                        dest_path=bg_dest_path,
+                        asset_type="background_music",
+                        segment_id="bg_music",
+                    )
                 )
-            )
             result_background_music = background_music.copy()
             result_background_music["local_path"] = bg_dest_path
 
@@ -126,53 +153,136 @@ class DownloadProcessor(AsyncProcessor):
             # If no background music, set it to None in the context
             context.set("background_music", None)
 
-        # Execute all downloads concurrently
-        download_results = await asyncio.gather(*download_tasks, return_exceptions=False)
+        # Videos and voice overs get their duration probed as soon as their
+        # file is on disk, overlapping the probes with the remaining downloads
+        probed_assets = [
+            segment[asset_type]
+            for segment in results
+            for asset_type in _PROBED_ASSET_TYPES
+            if isinstance(segment.get(asset_type), dict)
+            and segment[asset_type].get("local_path")
+        ]
+        durations: Dict[str, Optional[float]] = dict.fromkeys(
+            asset["local_path"] for asset in probed_assets
+        )
+
+        # Execute downloads with a bounded pool of workers; each result is
+        # None on success or the error message, in request order
+        download_errors = await self._download_all(download_requests, durations)
 
-        # Process results and collect errors
-        failed_downloads = []
-        for result in download_results:
-            if isinstance(result, dict) and not result.get("success", True):
-                failed_downloads.append(result)
-            elif isinstance(result, Exception):
-                failed_downloads.append({"error": str(result)})
+        failed_downloads = [
+            (request, error)
+            for request, error in zip(download_requests, download_errors)
+            if error is not None
+        ]
 
         if failed_downloads:
             # Format error details
             error_details = []
-            for error in failed_downloads[:5]:  # Limit to first 5 errors
-                if isinstance(error, dict):
-                    error_msg = error.get("error", "Unknown error")
-                    asset_type = error.get("asset_type", "unknown")
-                    segment_id = error.get("segment_id", "unknown")
-                    url = error.get("url", "unknown")
-                    error_details.append(f"{asset_type} for segment {segment_id} ({url}): {error_msg}")
-                else:
-                    error_details.append(str(error))
-            
+            for request, error in failed_downloads[:5]:  # Limit to first 5 errors
+                error_details.append(
+                    f"{request.asset_type} for segment {request.segment_id} "
+                    f"({request.url}): {error}"
+                )
+
             error_message = f"Failed to download {len(failed_downloads)} assets. First few errors:\n"
             error_message += "\n".join(error_details)
             raise DownloadError(error_message)
 
+        # Store durations as asset["probed_duration"], so rendering does not
+        # run ffprobe (or a separate voice over pass) per segment
+        for asset in probed_assets:
+            duration = durations[asset["local_path"]]
+            # Unprobeable files are left to the renderer's own fallback
+            if duration is not None:
+                asset["probed_duration"] = duration
         return results
 
-    async def _download_asset(
-        self, url: str, dest_path: str, asset_type: str, segment_id: str
-    ) -> Dict[str, Any]:
-        """Helper method to download a single asset"""
+    async def _download_all(
+        self,
+        download_requests: List[DownloadRequest],
+        durations: Dict[str, Optional[float]],
+    ) -> List[Optional[str]]:
+        """
+        Download all requests with at most settings.download_max_concurrent
+        workers pulling from a shared queue.
+
+        Every downloaded file whose path is a key of durations is probed right
+        away (at most settings.media_probe_max_concurrent at once) and its
+        duration stored there; assets sharing a URL share a file, so each
+        file is probed once.
+
+        The job cannot render with a missing asset, so the first failure
+        cancels the other workers and probes and leaves the rest unstarted.
+        A direct download stops at once; with the asset cache, a transfer
+        shared with another job keeps running for that job and is only
+        stopped once no job awaits it any more.
+
+        Returns:
+            Error message per request (None when it succeeded or was not
+            attempted), in the same order as download_requests
+        """
+        download_results: List[Optional[str]] = [None] * len(download_requests)
+        if not download_requests:
+            return download_results
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in enumerate(download_requests):
+            queue.put_nowait(item)
+
+        probe_semaphore = asyncio.Semaphore(
+            max(1, settings.media_probe_max_concurrent)
+        )
+
+        async def probe(path: str) -> None:
+            async with probe_semaphore:
+                durations[path] = await probe_duration_async(path)
+
+        async def worker(tg: asyncio.TaskGroup) -> None:
+            while True:
+                try:
+                    idx, request = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                error = await self._download_asset(request)
+                download_results[idx] = error
+                if error is not None:
+                    raise _DownloadFailed(error)
+                # Probe in its own task; the worker moves on to the next download
+                if request.dest_path in durations:
+                    tg.create_task(probe(request.dest_path))
+
+        worker_count = max(
+            1, min(settings.download_max_concurrent, len(download_requests))
+        )
+        try:
+            async with asyncio.TaskGroup() as tg:
+                for _ in range(worker_count):
+                    tg.create_task(worker(tg))
+        except* _DownloadFailed:
+            # Recorded in download_results; the caller raises DownloadError
+            pass
+        return download_results
+
+    async def _download_asset(self, request: DownloadRequest) -> Optional[str]:
+        """Download a single asset, returning None on success or the error message"""
+        url = request.url
+        asset_type = request.asset_type
         try:
             if not url or not isinstance(url, str):
                 raise ValueError(f"Invalid URL: {url}")
-                
-            file_path = await download_file(url, destination=dest_path, overwrite=True)
-            
+
+            file_path = await download_file(
+                url, destination=request.dest_path, overwrite=True
+            )
+
             if not file_path or not Path(file_path).exists():
                 raise FileNotFoundError(f"Downloaded file not found at {file_path}")
-                
+
             self.logger.debug(
                 "Downloaded %s asset from %s to %s", asset_type, url, file_path
             )
-            return {"success": True, "path": str(file_path)}
+            return None
 
         except Exception as e:
             error_msg = f"Failed to download {asset_type} from {url}: {str(e)}"
@@ -180,24 +290,19 @@ class DownloadProcessor(AsyncProcessor):
 
             if hasattr(self, "metrics_collector") and self.metrics_collector is not None:
                 try:
-                    await self.metrics_collector.increment_counter("asset_download_failed")
+                    self.metrics_collector.increment_counter("asset_download_failed")
                 except Exception as metrics_error:
                     self.logger.error(
                         "Failed to record metrics: %s", str(metrics_error), exc_info=True
                     )
-                
+
             # Log additional context
             self.logger.warning(
                 "Failed to download %s for segment %s: %s",
                 asset_type,
-                segment_id,
+                request.segment_id,
                 str(e)[:100]
             )
-            # Return a dict with error information instead of raising
-            return {
-                "success": False,
-                "error": str(e),
-                "asset_type": asset_type,
-                "segment_id": segment_id,
-                "url": url
-            }
+            # Return the error instead of raising; the request carries the
+            # asset details needed for reporting
+            return str(e) or "Unknown error"
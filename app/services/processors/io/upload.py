@@ -10,6 +10,7 @@ S3UploadProcessor: Uploads video file to AWS S3 bucket.
 """
 
 from typing import Any, Optional
+import functools
 import logging
 import os
 import asyncio
@@ -24,6 +25,22 @@ from app.config.settings import settings
 from app.core.exceptions import ProcessingError, UploadError
 
 
+@functools.lru_cache(maxsize=4)
+def _get_s3_client(region: str, aws_key: str, aws_secret: str):
+    """
+    Return a shared S3 client for these credentials.
+
+    Creating a client loads the service model and a new connection pool;
+    boto3 clients are thread-safe, so uploads reuse one instead.
+    """
+    return boto3.client(
+        "s3",
+        region_name=region,
+        aws_access_key_id=aws_key,
+        aws_secret_access_key=aws_secret,
+    )
+
+
 class S3UploadProcessor(AsyncProcessor):
     """
     Processor for uploading video files to AWS S3.
@@ -97,6 +114,12 @@ class S3UploadProcessor(AsyncProcessor):
                 "Missing video_path or video_id for S3 upload", video_id=video_id
             )
 
+        # Skip the upload pass entirely when the request only wants the local file
+        if context.get("upload") is False:
+            self._end_processing(metric, success=True, items_processed=0)
+            self.logger.info("S3 upload skipped - disabled by request")
+            return f"local://{video_path}"
+
         # Check if S3 configuration is available
         if not bucket or not region or not aws_key or not aws_secret:
             self._end_processing(metric, success=True, items_processed=0)
@@ -106,12 +129,7 @@ class S3UploadProcessor(AsyncProcessor):
         try:
             # Sử dụng boto3 sync trong thread pool để đảm bảo upload thành công
             def upload_to_s3():
-                s3_client = boto3.client(
-                    "s3",
-                    region_name=region,
-                    aws_access_key_id=aws_key,
-                    aws_secret_access_key=aws_secret,
-                )
+                s3_client = _get_s3_client(region, aws_key, aws_secret)
                 with open(video_path, "rb") as f:
                     response = s3_client.upload_fileobj(
                         f, bucket, key, ExtraArgs={"ContentType": "video/mp4"}
@@ -3,17 +3,52 @@
 import logging
 import os
 import uuid
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from app.interfaces import IAudioProcessor
 from utils.subprocess_utils import safe_subprocess_run
 
 logger = logging.getLogger(__name__)
 
+# Sample rate of segment audio (the renders write lossless audio at this rate)
+SEGMENT_AUDIO_SAMPLE_RATE = 44100
+
 
 class AudioProcessor(IAudioProcessor):
     """Handles audio composition for segments (voice over, delays, normalization)"""
 
+    @staticmethod
+    def build_voice_over_filters(voice_over: Dict) -> List[str]:
+        """Build the voice over filter chain (delays and normalization).
+
+        The chain can run in its own ffmpeg pass (create_audio_composition) or
+        be prepended to the audio filters of the segment render.
+
+        Args:
+            voice_over: voice_over configuration of a segment
+
+        Returns:
+            List[str]: ffmpeg audio filters, in order
+        """
+        vo_start_delay = float(voice_over.get("start_delay", 0))
+        vo_end_delay = float(voice_over.get("end_delay", 0))
+
+        # Normalize the voice first, then pad: the inserted silence would
+        # otherwise run through loudnorm (192 kHz analysis) and volume too.
+        # loudnorm outputs 192 kHz; return to the segment rate right away so
+        # the rest of the chain processes ~4x fewer samples
+        vo_filters = [
+            "loudnorm=I=-8:TP=-0.5:LRA=5",
+            f"aresample={SEGMENT_AUDIO_SAMPLE_RATE}",
+            "volume=2.0",
+        ]
+        if vo_start_delay > 0:
+            delay_ms = int(vo_start_delay * 1000)
+            vo_filters.append(f"adelay={delay_ms}|{delay_ms}")
+        if vo_end_delay > 0:
+            vo_filters.append(f"apad=pad_dur={vo_end_delay}")
+        return vo_filters
+
     @staticmethod
     def create_audio_composition(segment: Dict, temp_dir: str) -> Optional[str]:
         """Create audio composition for a segment with voice over, delays, and normalization.
@@ -28,45 +63,25 @@ class AudioProcessor(IAudioProcessor):
         segment_id = segment.get("id", str(uuid.uuid4()))
         voice_over = segment.get("voice_over", {})
         voice_over_path = voice_over.get("local_path")
-        vo_start_delay = float(voice_over.get("start_delay", 0))
-        vo_end_delay = float(voice_over.get("end_delay", 0))
 
         if not voice_over_path:
             return None
 
-        filter_inputs = [f"-i {voice_over_path}"]
-        filter_complex = []
-        amix_inputs = []
-        idx = 0
-
-        vo_filters = []
-        if vo_start_delay > 0:
-            delay_ms = int(vo_start_delay * 1000)
-            vo_filters.append(f"adelay={delay_ms}|{delay_ms}")
-        vo_filters.append("loudnorm=I=-8:TP=-0.5:LRA=5")
-        vo_filters.append("volume=2.0")
-        if vo_end_delay > 0:
-            vo_filters.append(f"apad=pad_dur={vo_end_delay}")
-        vo_chain = ",".join(vo_filters) if vo_filters else "anull"
-        filter_complex.append(f"[{idx}:a]{vo_chain}[vo]")
-        amix_inputs.append("[vo]")
-        filter_complex.append(
-            f"{''.join(amix_inputs)}amix=inputs=1:duration=first[aout]"
-        )
-
+        vo_filters = AudioProcessor.build_voice_over_filters(voice_over)
         out_audio = os.path.join(temp_dir, f"audio_{segment_id}.wav")
-        ffmpeg_cmd = ["ffmpeg", "-y"]
-        for inp in filter_inputs:
-            ffmpeg_cmd += inp.split()
-        ffmpeg_cmd += [
-            "-filter_complex",
-            ";".join(filter_complex),
-            "-map",
-            "[aout]",
+        # Single input: a plain -af chain, no filter_complex/amix stage needed
+        ffmpeg_cmd = [
+            "ffmpeg",
+            "-y",
+            "-i",
+            voice_over_path,
+            "-af",
+            ",".join(vo_filters),
+            "-vn",
             "-ac",
             "2",
             "-ar",
-            "44100",
+            str(SEGMENT_AUDIO_SAMPLE_RATE),
             out_audio,
         ]
         safe_subprocess_run(
@@ -5,21 +5,21 @@ ImageAutoProcessor: Kiểm tra và tự động thay thế ảnh cho segment n
 """
 
 import asyncio
+import hashlib
 import logging
 import os
-import shutil
 from pathlib import Path
-from typing import Any, List, Optional, Tuple
-from uuid import uuid4
+from typing import Any, Dict, List, Optional, Tuple
 
-import requests
 from pydantic import BaseModel
 from pydantic_ai import Agent
 from pydantic_ai.models.openai import OpenAIModel
 
 from app.config.settings import settings
-from app.core.exceptions import ProcessingError
+from app.core.exceptions import ProcessingError, VideoCreationError
 from app.services.processors.core.base_processor import AsyncProcessor, ProcessingStage
+from app.services.processors.core.metrics import MetricsCollector
+from utils.download_utils import download_file
 from utils.image_utils import is_image_size_valid, search_pixabay_image
 
 logger = logging.getLogger(__name__)
@@ -36,8 +36,8 @@ class ImageProcessor(AsyncProcessor):
     AI-powered image validation and replacement processor using PydanticAI.
     """
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, metrics_collector: Optional[MetricsCollector] = None):
+        super().__init__(metrics_collector)
         # Luôn dùng trực tiếp settings.openai_api_key
         self.ai_api_key = settings.openai_api_key
 
@@ -163,24 +163,20 @@ class ImageProcessor(AsyncProcessor):
                     f"với fields: {fields}"
                 )
 
-            # Tạo tên file và đường dẫn mới
+            # Tên file theo hash của URL: các segment nhận cùng một ảnh thay thế
+            # (ví dụ ảnh fallback) dùng chung một file, chỉ tải một lần
             ext = os.path.splitext(new_url)[1] or ".jpg"
-            new_filename = f"auto_image_{uuid4().hex}{ext}"
+            url_hash = hashlib.blake2b(new_url.encode("utf-8"), digest_size=16)
+            new_filename = f"auto_image_{url_hash.hexdigest()}{ext}"
             save_path = Path(temp_dir) / new_filename
 
-            # Tải ảnh về local
-            def download_image(url, path):
-                with requests.get(url, stream=True, timeout=10) as r:
-                    r.raise_for_status()
-                    with open(path, "wb") as f:
-                        shutil.copyfileobj(r.raw, f)
-
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, download_image, new_url, str(save_path))
+            # Tải ảnh về local qua session aiohttp dùng chung (keep-alive, cache);
+            # bỏ qua nếu file đã có trong temp_dir
+            await download_file(new_url, save_path)
 
             return new_url, str(save_path)
 
-        except (requests.RequestException, OSError) as e:
+        except (VideoCreationError, OSError) as e:
             raise ProcessingError(f"Download replacement image failed: {e}") from e
 
     async def _ai_search_image(
@@ -204,7 +200,10 @@ class ImageProcessor(AsyncProcessor):
 
         # Thử từng keyword cho đến khi tìm được ảnh phù hợp
         for keywords in keywords_list:
-            url = search_pixabay_image(keywords, pixabay_key, min_width, min_height)
+            # requests-based search; run it off the event loop
+            url = await asyncio.to_thread(
+                search_pixabay_image, keywords, pixabay_key, min_width, min_height
+            )
             if url:
                 logger.info(
                     "✅ Found image with keywords: %s for content: '%s'",
@@ -214,17 +213,77 @@ class ImageProcessor(AsyncProcessor):
                 return url
 
         # Nếu không tìm được gì, thử keyword fallback cuối cùng
-        fallback_url = search_pixabay_image(
-            "abstract background", pixabay_key, min_width, min_height
+        fallback_url = await asyncio.to_thread(
+            search_pixabay_image,
+            "abstract background",
+            pixabay_key,
+            min_width,
+            min_height,
         )
         if fallback_url:
             logger.warning("⚠️ Using fallback image for content: '%s'", content)
 
         return fallback_url
 
+    async def process_segment(
+        self, segment: Dict[str, Any], temp_dir: str, keywords: Optional[List[str]]
+    ) -> Dict[str, Any]:
+        """Validate the image of a single segment and replace it if needed.
+
+        Args:
+            segment: Segment dictionary with downloaded asset local paths
+            temp_dir: Temporary directory for replacement images
+            keywords: Keywords from the request used for image search
+
+        Returns:
+            Copy of the segment with a valid image (or the original video)
+        """
+        # Kiểm tra video trước, nếu có video thì valid = True luôn
+        video_obj = segment.get("video")
+        if video_obj:
+            valid = True
+        else:
+            # Nếu không có video, kiểm tra image
+            image_obj = segment.get("image", {})
+            image_path = image_obj.get("local_path")
+            valid = False
+            if image_path:
+                valid = is_image_size_valid(
+                    image_path,
+                    settings.video_min_image_width,
+                    settings.video_min_image_height,
+                )
+
+        # Tách content và fields để truyền riêng biệt
+        content = segment.get("voice_over", {}).get("content", "")
+        fields = keywords  # keywords từ context
+
+        merged_asset = segment.copy()
+        # Chỉ thay thế ảnh nếu không phải video và ảnh không hợp lệ
+        if not valid:
+            # Tìm kiếm và tải ảnh mới
+            new_url, local_path = await self._download_image(
+                content=content, fields=fields, temp_dir=temp_dir
+            )
+
+            # Cập nhật thông tin asset
+            if "image" in merged_asset and isinstance(merged_asset["image"], dict):
+                merged_asset["image"]["url"] = new_url
+                merged_asset["image"]["local_path"] = local_path
+            else:
+                merged_asset["image"] = {
+                    "url": new_url,
+                    "local_path": local_path,
+                }
+
+        return merged_asset
+
     async def process(self, input_data: Any, **kwargs) -> Any:
         """Async implementation of image processing and validation
 
+        Library entry point only: the pipeline validates images through
+        SegmentPreparationProcessor, which calls process_segment per segment.
+
         Args:
             input_data: download_results (list: result_segments)
             **kwargs: Additional parameters including 'context' with segments and other metadata
@@ -253,48 +312,11 @@ class ImageProcessor(AsyncProcessor):
             # Check segment count matches asset count
             keywords = context.get("keywords")
 
-            min_width = settings.video_min_image_width
-            min_height = settings.video_min_image_height
-
             new_result_segments = []
             for segment in result_segments:
-                # Kiểm tra video trước, nếu có video thì valid = True luôn
-                video_obj = segment.get("video")
-                if video_obj:
-                    valid = True
-                else:
-                    # Nếu không có video, kiểm tra image
-                    image_obj = segment.get("image", {})
-                    image_path = image_obj.get("local_path")
-                    valid = False
-                    if image_path:
-                        valid = is_image_size_valid(image_path, min_width, min_height)
-
-                # Tách content và fields để truyền riêng biệt
-                content = segment.get("voice_over", {}).get("content", "")
-                fields = keywords  # keywords từ context
-
-                merged_asset = segment.copy()
-                # Chỉ thay thế ảnh nếu không phải video và ảnh không hợp lệ
-                if not valid:
-                    # Tìm kiếm và tải ảnh mới
-                    new_url, local_path = await self._download_image(
-                        content=content, fields=fields, temp_dir=temp_dir
-                    )
-
-                    # Cập nhật thông tin asset
-                    if "image" in merged_asset and isinstance(
-                        merged_asset["image"], dict
-                    ):
-                        merged_asset["image"]["url"] = new_url
-                        merged_asset["image"]["local_path"] = local_path
-                    else:
-                        merged_asset["image"] = {
-                            "url": new_url,
-                            "local_path": local_path,
-                        }
-
-                new_result_segments.append(merged_asset)
+                new_result_segments.append(
+                    await self.process_segment(segment, temp_dir, keywords)
+                )
 
             self._end_processing(
                 metric, success=True, items_processed=len(new_result_segments)
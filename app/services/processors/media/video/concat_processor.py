@@ -7,6 +7,7 @@ import os
 from typing import List, Dict, Optional
 import asyncio
 
+from app.config.settings import settings
 from app.core.exceptions import ProcessingError
 from app.interfaces.pipeline.context import IPipelineContext
 from app.services.processors.core.base_processor import (
@@ -17,6 +18,9 @@ from utils.video_utils import ffmpeg_concat_videos
 
 logger = logging.getLogger(__name__)
 
+# Output directory with a trailing separator, resolved once at import
+_OUTPUT_PREFIX = os.path.join(settings.output_directory, "")
+
 
 class ConcatenationProcessor(AsyncProcessor):
     """Handles video concatenation with transitions and background music"""
@@ -39,8 +43,7 @@ class ConcatenationProcessor(AsyncProcessor):
         context: IPipelineContext = kwargs.get("context", {})
         background_music = context.get("background_music")
         temp_dir = context.temp_dir
-        filename = f"final_video_{context.video_id}.mp4"
-        output_path = os.path.join("data", "output", filename)
+        output_path = f"{_OUTPUT_PREFIX}final_video_{context.video_id}.mp4"
         context.set("final_video_path", output_path)
         return await self.concatenate_clips(
             video_segments, output_path, temp_dir, background_music
@@ -78,27 +81,24 @@ class ConcatenationProcessor(AsyncProcessor):
             )
             self.logger.info("Output path: %s", output_path)
 
-            # Run ffmpeg in a thread since it's a blocking I/O operation
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,  # Use default thread pool
-                lambda: ffmpeg_concat_videos(
-                    video_segments=video_segments,
-                    output_path=output_path,
-                    temp_dir=temp_dir,
-                    background_music=background_music,
-                    logger=self.logger,
-                ),
+            # Run ffmpeg in a thread since it's a blocking I/O operation;
+            # the event loop keeps serving other requests meanwhile
+            await asyncio.to_thread(
+                ffmpeg_concat_videos,
+                video_segments=video_segments,
+                output_path=output_path,
+                temp_dir=temp_dir,
+                background_music=background_music,
+                logger=self.logger,
             )
 
-            # Verify output exists
-            if not os.path.exists(output_path):
+            # Verify output exists and get file size for metrics in one stat
+            try:
+                file_size = os.stat(output_path).st_size
+            except FileNotFoundError:
                 raise ProcessingError(
                     f"Concatenation completed but output file not found: {output_path}"
-                )
-
-            # Get file size for metrics
-            file_size = os.path.getsize(output_path)
+                ) from None
 
             self.logger.info("✅ Video concatenation completed successfully")
             self.logger.info("   Output: %s", output_path)
@@ -110,7 +110,7 @@ class ConcatenationProcessor(AsyncProcessor):
             return output_path
 
         except Exception as e:
-            error_msg = "Failed to concatenate video clips: %s", e
+            error_msg = f"Failed to concatenate video clips: {e}"
             self.logger.error(error_msg, exc_info=True)
             self._end_processing(metric, success=False, error_message=error_msg)
             raise ProcessingError(error_msg) from e
@@ -10,7 +10,8 @@ import asyncio
 import logging
 import os
 import uuid
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
 
 from app.config import settings
 from app.core.exceptions import ProcessingError, VideoCreationError
@@ -20,10 +21,31 @@ from app.services.processors.core.base_processor import AsyncProcessor, Processi
 from app.services.processors.media.video.transition_processor import TransitionProcessor
 from app.services.processors.text.overlay import TextOverlayProcessor
 from utils.subprocess_utils import safe_subprocess_run, SubprocessError
+from utils.audio_utils import get_audio_duration
 from utils.image_utils import process_image
+from utils.video_utils import (
+    get_gpu_scale_args,
+    get_video_decoder_args,
+    get_video_encoder_args,
+    run_encode,
+)
 
 logger = logging.getLogger(__name__)
 
+# Segment audio stays lossless (it is encoded once, after concat/mixing).
+# FLAC at its fastest level roughly halves the PCM bytes each intermediate
+# writes and concat reads back (silent tracks shrink to almost nothing)
+_SEGMENT_AUDIO_ARGS = ("-c:a", "flac", "-compression_level", "0")
+
+# Dedicated threads for segment renders: each one blocks on ffmpeg for the
+# whole encode, and in the default executor they would starve the short
+# to_thread calls (Gentle alignment, image search, job store) of workers.
+# Sized like the per-job render limit, so it also caps renders across jobs
+_RENDER_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, settings.segment_clip_concurrency),
+    thread_name_prefix="segment-render",
+)
+
 
 class VideoProcessor(AsyncProcessor):
     """Pipeline Processor for creating individual segment clips from List of segments"""
@@ -33,7 +55,10 @@ class VideoProcessor(AsyncProcessor):
     ) -> List[Dict[str, str]]:
         """Process input data asynchronously by delegating to process_segment.
 
-        This method implements the abstract method from BaseProcessor.
+        This method implements the abstract method from BaseProcessor. It is
+        a library entry point only: the pipeline renders segments through
+        SegmentStreamProcessor, which calls process_segment with up to
+        settings.segment_clip_concurrency renders at once.
 
         Args:
             input_data: List of segment dictionaries
@@ -77,16 +102,20 @@ class VideoProcessor(AsyncProcessor):
             segment_id = segment.get("id", "unknown")
 
             logger.debug("Processing segment %s", segment_id)
-            output_path = await self._create_segment_clip_async(
+            output_path, duration, encoder = await self._create_segment_clip_async(
                 segment, temp_dir, **kwargs
             )
 
             self._end_processing(metric, success=True, items_processed=1)
 
+            # Carry the rendered duration and encoder with the path so
+            # concatenation can sum clip durations instead of probing the
+            # joined video, and knows whether stream copy is safe
             return {
                 "id": segment_id,
                 "path": output_path,
-                # "duration": self._get_duration(output_path),
+                "duration": duration,
+                "encoder": encoder,
             }
 
         except Exception as e:
@@ -101,19 +130,37 @@ class VideoProcessor(AsyncProcessor):
 
     async def _create_segment_clip_async(
         self, segment: Dict[str, Any], temp_dir: str, **_
-    ) -> str:
-        """Async wrapper around the existing create_segment_clip method"""
-        # For now, we'll run the sync version in a thread pool
-        # This can be optimized later with native async FFmpeg
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, lambda: self.create_segment_clip(segment, temp_dir)
+    ) -> Tuple[str, float, str]:
+        """Async wrapper around render_segment_clip"""
+        # Run the blocking ffmpeg calls on the render pool; callers bound how
+        # many segments of one job render at once (segment_clip_concurrency)
+        loop = asyncio.get_running_loop()
+        render = loop.run_in_executor(
+            _RENDER_EXECUTOR, self.render_segment_clip, segment, temp_dir
         )
+        try:
+            return await asyncio.shield(render)
+        except asyncio.CancelledError:
+            # The ffmpeg run in the thread cannot be interrupted; wait for it
+            # so the job's temp dir is not removed while it is still writing
+            await asyncio.wait([render])
+            raise
 
     @classmethod
     def create_segment_clip(cls, segment: Dict, temp_dir: str) -> str:
         """Create a video segment clip from segment data.
 
+        Returns:
+            str: Path to the created segment video file.
+        """
+        return cls.render_segment_clip(segment, temp_dir)[0]
+
+    @classmethod
+    def render_segment_clip(
+        cls, segment: Dict, temp_dir: str
+    ) -> Tuple[str, float, str]:
+        """Create a video segment clip from segment data.
+
         Args:
             segment (Dict): Dictionary containing segment information including
                 image, video, transitions, and voice-over data.
@@ -121,7 +168,9 @@ class VideoProcessor(AsyncProcessor):
                 intermediate files.
 
         Returns:
-            str: Path to the created segment video file.
+            Tuple[str, float, str]: Path to the created segment video file, its
+                duration in seconds (the value passed to ffmpeg's -t) and the
+                video encoder that produced it.
 
         Raises:
             VideoCreationError: If required resources are missing or processing fails.
@@ -145,41 +194,47 @@ class VideoProcessor(AsyncProcessor):
         segment_id: str = segment.get("id", str(uuid.uuid4()))
         voice_over: Dict[str, Any] = segment.get("voice_over", {})
         segment_output_path: str = os.path.join(
-            temp_dir, f"temp_segment_{segment_id}.mp4"
+            temp_dir, f"temp_segment_{segment_id}.mkv"
         )
 
+        audio_pad_filters: List[str] = []
         if video_path and os.path.exists(video_path):
             input_type: str = "video"
             input_path: str = video_path
-            try:
-                probe_cmd: List[str] = [
-                    "ffprobe",
-                    "-v",
-                    "quiet",
-                    "-show_entries",
-                    "format=duration",
-                    "-of",
-                    "csv=p=0",
-                    video_path,
-                ]
-                result = safe_subprocess_run(
-                    probe_cmd,
-                    f"Get video duration for segment {segment_id}",
-                    logger,
-                )
-                duration_str = result.stdout.strip()
-                if not duration_str:
-                    raise ValueError("Empty duration output from ffprobe")
-                original_duration = float(duration_str)
-            except SubprocessError as e:
-                logger.warning(
-                    "Could not get video duration for segment %s, "
-                    "using default 4.0s. Error: %s\nCommand output: %s",
-                    segment_id,
-                    str(e),
-                    getattr(e, "stderr", "No stderr"),
-                )
-                original_duration = 4.0
+            probed_duration = video_obj.get("probed_duration")
+            if isinstance(probed_duration, (int, float)):
+                # Probed concurrently by the download stage
+                original_duration = float(probed_duration)
+            else:
+                try:
+                    probe_cmd: List[str] = [
+                        "ffprobe",
+                        "-v",
+                        "quiet",
+                        "-show_entries",
+                        "format=duration",
+                        "-of",
+                        "csv=p=0",
+                        video_path,
+                    ]
+                    result = safe_subprocess_run(
+                        probe_cmd,
+                        f"Get video duration for segment {segment_id}",
+                        logger,
+                    )
+                    duration_str = result.stdout.strip()
+                    if not duration_str:
+                        raise ValueError("Empty duration output from ffprobe")
+                    original_duration = float(duration_str)
+                except SubprocessError as e:
+                    logger.warning(
+                        "Could not get video duration for segment %s, "
+                        "using default 4.0s. Error: %s\nCommand output: %s",
+                        segment_id,
+                        str(e),
+                        getattr(e, "stderr", "No stderr"),
+                    )
+                    original_duration = 4.0
             audio_input_path = video_path
         else:
             input_type = "image"
@@ -195,87 +250,59 @@ class VideoProcessor(AsyncProcessor):
                 enhance_contrast=True,
                 enhance_saturation=True,
                 output_dir=temp_dir,
+                reuse_existing=True,
             )
             if not processed_image_paths:
                 raise VideoCreationError("Failed to process background image")
             input_path = processed_image_paths[0]
-            audio_path = AudioProcessor.create_audio_composition(segment, temp_dir)
-            if not audio_path:
-                raise VideoCreationError(
-                    "Audio composition failed or missing for segment"
-                )
-            try:
-                probe_cmd = [
-                    "ffprobe",
-                    "-v",
-                    "quiet",
-                    "-show_entries",
-                    "format=duration",
-                    "-of",
-                    "csv=p=0",
-                    audio_path,
-                ]
-                result = safe_subprocess_run(
-                    probe_cmd,
-                    f"Get audio duration for segment {segment_id}",
-                    logger,
+            voice_over_path = voice_over.get("local_path")
+            probed_vo_duration = voice_over.get("probed_duration")
+            if voice_over_path and isinstance(probed_vo_duration, (int, float)):
+                # Voice over length is known from the download stage, so its
+                # delays/normalization run inside this encode instead of a
+                # separate ffmpeg pass writing an intermediate WAV
+                audio_path = voice_over_path
+                audio_pad_filters.extend(
+                    AudioProcessor.build_voice_over_filters(voice_over)
                 )
-                original_duration = float(result.stdout.strip())
-            except SubprocessError as e:
-                logger.warning(
-                    "Could not get audio duration for segment %s: %s",
-                    segment_id,
-                    str(e),
+                original_duration = (
+                    float(probed_vo_duration)
+                    + max(0.0, float(voice_over.get("start_delay", 0)))
+                    + max(0.0, float(voice_over.get("end_delay", 0)))
                 )
-                original_duration = 4.0
-            fade_in_duration = float(transition_in.get("duration", 0) or 0)
-            fade_out_duration = float(transition_out.get("duration", 0) or 0)
-            extended_audio_path = audio_path
-            if fade_in_duration > 0 or fade_out_duration > 0:
-                extended_audio_path = os.path.join(
-                    temp_dir, f"extended_audio_{segment_id}.wav"
+            else:
+                audio_path = AudioProcessor.create_audio_composition(
+                    segment, temp_dir
                 )
-                audio_inputs = []
-                if fade_in_duration > 0:
-                    audio_inputs.append(
-                        f"-f lavfi -t {fade_in_duration} "
-                        "-i anullsrc=channel_layout=stereo:sample_rate=44100"
+                if not audio_path:
+                    raise VideoCreationError(
+                        "Audio composition failed or missing for segment"
                     )
-                audio_inputs.append(f"-i {audio_path}")
-                if fade_out_duration > 0:
-                    audio_inputs.append(
-                        f"-f lavfi -t {fade_out_duration} "
-                        "-i anullsrc=channel_layout=stereo:sample_rate=44100"
+                try:
+                    # The composition is a PCM WAV, so this reads the header
+                    # instead of spawning ffprobe
+                    original_duration = get_audio_duration(audio_path)
+                except (SubprocessError, ValueError, OSError) as e:
+                    logger.warning(
+                        "Could not get audio duration for segment %s: %s",
+                        segment_id,
+                        str(e),
                     )
-                if fade_in_duration > 0 and fade_out_duration > 0:
-                    filter_str = "[0:a][1:a][2:a]concat=n=3:v=0:a=1[aout]"
-                elif fade_in_duration > 0 or fade_out_duration > 0:
-                    filter_str = "[0:a][1:a]concat=n=2:v=0:a=1[aout]"
-                else:
-                    filter_str = "[0:a]acopy[aout]"
-                extend_cmd = ["ffmpeg", "-y"]
-                for inp in audio_inputs:
-                    extend_cmd += inp.split()
-                extend_cmd += [
-                    "-filter_complex",
-                    filter_str,
-                    "-map",
-                    "[aout]",
-                    "-ac",
-                    "2",
-                    "-ar",
-                    "44100",
-                    extended_audio_path,
-                ]
-                safe_subprocess_run(
-                    extend_cmd,
-                    f"Create extended audio for segment {segment_id}",
-                    logger,
+                    original_duration = 4.0
+            # Pad silence for the transitions inside the final encode's audio
+            # filter chain instead of rendering an extended WAV first
+            fade_in_duration = float(transition_in.get("duration", 0) or 0)
+            fade_out_duration = float(transition_out.get("duration", 0) or 0)
+            if fade_in_duration > 0:
+                audio_pad_filters.append(
+                    f"adelay={int(round(fade_in_duration * 1000))}:all=1"
                 )
-            audio_input_path = extended_audio_path
+            if fade_out_duration > 0:
+                audio_pad_filters.append(f"apad=pad_dur={fade_out_duration}")
+            audio_input_path = audio_path
 
         video_filters = ["scale=1920:1080", "format=yuv420p"]
-        audio_filters = ["volume=1.5"]
+        audio_filters = audio_pad_filters + ["volume=1.5"]
         fade_in_duration = float(transition_in.get("duration", 0) or 0)
         fade_out_duration = float(transition_out.get("duration", 0) or 0)
         fade_in_type = (
@@ -355,6 +382,7 @@ class VideoProcessor(AsyncProcessor):
         delay = fade_in_duration + voice_over.get("start_delay", 0)
         # Handle text overlays - build them separately to avoid conflicts
         text_overs = segment.get("text_over")
+        has_text_overlay = False
         if text_overs:
             if not isinstance(text_overs, list):
                 raise VideoCreationError("text_over must be an array of objects")
@@ -366,9 +394,24 @@ class VideoProcessor(AsyncProcessor):
                 )
                 if drawtext_filter:
                     video_filters.append(drawtext_filter)
+                    has_text_overlay = True
 
         # Build FFmpeg command based on input type
         if input_type == "video":
+            decoder_args = get_video_decoder_args()
+            video_filter = ",".join(video_filters)
+            pix_fmt_args = ["-pix_fmt", "yuv420p"]
+            gpu_args = (
+                get_gpu_scale_args(1920, 1080)
+                if video_filters == ["scale=1920:1080", "format=yuv420p"]
+                else None
+            )
+            if gpu_args:
+                # No fades or text: decode, scale and encode entirely on the
+                # GPU, without copying frames back to system memory
+                decoder_args = gpu_args["input"]
+                video_filter = gpu_args["filter"]
+                pix_fmt_args = []
             ffmpeg_cmd = [
                 "ffmpeg",
                 "-y",
@@ -376,10 +419,11 @@ class VideoProcessor(AsyncProcessor):
                 "lavfi",
                 "-i",
                 "anullsrc=channel_layout=stereo:sample_rate=44100",
+                *decoder_args,
                 "-i",
                 input_path,
                 "-vf",
-                ",".join(video_filters),
+                video_filter,
                 "-af",
                 ",".join(audio_filters),
                 "-t",
@@ -388,28 +432,41 @@ class VideoProcessor(AsyncProcessor):
                 "1:v",
                 "-map",
                 "0:a",
-                "-pix_fmt",
-                "yuv420p",
+                *pix_fmt_args,
                 "-r",
                 str(settings.video_default_fps),
-                "-c:v",
-                "libx264",
-                "-c:a",
-                "aac",
-                "-b:a",
-                "192k",
+                "-threads",
+                str(settings.ffmpeg_segment_threads),
+                *get_video_encoder_args(),
+                *_SEGMENT_AUDIO_ARGS,
                 segment_output_path,
             ]
         else:
+            encoder_args = get_video_encoder_args()
+            if not has_text_overlay and "libx264" in encoder_args:
+                # Slideshow case: every frame is the same picture (up to the
+                # fades), so let libx264 tune for static content instead of
+                # re-analysing identical frames
+                encoder_args = [*encoder_args, "-tune", "stillimage"]
             ffmpeg_cmd = [
                 "ffmpeg",
                 "-y",
                 "-loop",
                 "1",
+                # Loop the image at the output rate (captions too): at the
+                # image2 default of 25 fps every 25th frame went through the
+                # filters only to be dropped by -r
+                "-framerate",
+                str(settings.video_default_fps),
                 "-i",
                 input_path,
                 "-i",
                 audio_input_path,
+                # Voice overs may carry cover art; take video from the image only
+                "-map",
+                "0:v",
+                "-map",
+                "1:a",
                 "-vf",
                 ",".join(video_filters),
                 "-af",
@@ -420,13 +477,15 @@ class VideoProcessor(AsyncProcessor):
                 "yuv420p",
                 "-r",
                 str(settings.video_default_fps),
-                "-c:v",
-                "libx264",
-                "-c:a",
-                "aac",
-                "-b:a",
-                "192k",
+                "-threads",
+                str(settings.ffmpeg_segment_threads),
+                *encoder_args,
+                *_SEGMENT_AUDIO_ARGS,
+                "-ac",
+                "2",
+                "-ar",
+                "44100",
                 segment_output_path,
             ]
-        safe_subprocess_run(ffmpeg_cmd, f"Create segment clip {segment_id}", logger)
-        return segment_output_path
+        encoder = run_encode(ffmpeg_cmd, f"Create segment clip {segment_id}", logger)
+        return segment_output_path, total_duration, encoder
@@ -1,5 +1,7 @@
+import functools
 import os
 import logging
+from typing import Dict, Tuple
 from app.config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -31,6 +33,46 @@ class TextOverlayProcessor:
 
         return escaped
 
+    # Font files found on disk, keyed by (working directory, font_file) since
+    # relative paths resolve against it; misses are not cached, so a font
+    # that appears later is picked up instead of falling back for good
+    _resolved_fonts: Dict[Tuple[str, str], str] = {}
+
+    @staticmethod
+    def _font_param(font_file: str) -> str:
+        """Resolve a font file to its drawtext parameter (fontfile= or font=)"""
+        key = (os.getcwd(), font_file)
+        cached = TextOverlayProcessor._resolved_fonts.get(key)
+        if cached is not None:
+            return cached
+
+        if not os.path.exists(font_file) and not font_file.startswith("/"):
+            font_file = os.path.join(os.getcwd(), font_file)
+            if not os.path.exists(font_file):
+                logger.warning(
+                    "Font file not found: %s, using system default", font_file
+                )
+                font_file = "Arial"
+
+        if os.path.exists(font_file):
+            param = f"fontfile={font_file}"
+            TextOverlayProcessor._resolved_fonts[key] = param
+            return param
+        return f"font={font_file}"
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _style_params(font_color, font_size, x, y) -> str:
+        """Build the fontcolor/fontsize/x/y drawtext parameters"""
+        return ":".join(
+            (
+                f"fontcolor={font_color}",
+                f"fontsize={font_size}",
+                f"x={x}",
+                f"y={y}",
+            )
+        )
+
     @staticmethod
     def build_drawtext_filter(text_over, total_duration, delay=0.0):
         """Build drawtext filter without unsupported alpha parameter"""
@@ -53,37 +95,32 @@ class TextOverlayProcessor:
         else:
             text_end = float(text_end)
 
-        # Handle font
-        font_file = text_over.get("font_file", settings.text_default_font_file)
-        if not os.path.exists(font_file) and not font_file.startswith("/"):
-            font_file = os.path.join(os.getcwd(), font_file)
-            if not os.path.exists(font_file):
-                logger.warning(
-                    "Font file not found: %s, using system default", font_file
-                )
-                font_file = "Arial"
-
-        # Build drawtext parameters with minimal approach - NO ALPHA parameter
-        params = []
-
-        # Font parameter
-        if os.path.exists(font_file):
-            params.append(f"fontfile={font_file}")
-        else:
-            params.append(f"font={font_file}")
-
-        # Text parameter - single quotes around text only
-        params.append(f"text='{safe_text}'")
+        # A caption that never shows inside the clip would still cost a
+        # drawtext instance (font load + per-frame timeline check)
+        if text_end <= 0 or text_start >= total_duration:
+            logger.debug(
+                "Skipping text overlay outside clip (%.3f-%.3f of %.3fs)",
+                text_start,
+                text_end,
+                total_duration,
+            )
+            return None
 
-        # Style parameters
-        params.append(
-            f"fontcolor={text_over.get('font_color', settings.text_default_font_color)}"
-        )
-        params.append(
-            f"fontsize={text_over.get('font_size', settings.text_default_font_size)}"
-        )
-        params.append(f"x={text_over.get('x', settings.text_default_position_x)}")
-        params.append(f"y={text_over.get('y', settings.text_default_position_y)}")
+        # Font and style fragments are shared by every overlay with the same
+        # style, so they are resolved once per distinct style (cached)
+        params = [
+            TextOverlayProcessor._font_param(
+                text_over.get("font_file", settings.text_default_font_file)
+            ),
+            # Text parameter - single quotes around text only
+            f"text='{safe_text}'",
+            TextOverlayProcessor._style_params(
+                text_over.get("font_color", settings.text_default_font_color),
+                text_over.get("font_size", settings.text_default_font_size),
+                text_over.get("x", settings.text_default_position_x),
+                text_over.get("y", settings.text_default_position_y),
+            ),
+        ]
 
         # Timing parameters - format numbers to avoid decimal issues
         start_formatted = f"{text_start:.3f}".rstrip("0").rstrip(".")
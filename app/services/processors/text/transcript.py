@@ -6,6 +6,7 @@ với âm thanh sử dụng Gentle forced aligner, và tạo các đoạn văn b
 """
 
 # Standard library imports
+import asyncio
 import json
 import logging
 import os
@@ -22,11 +23,22 @@ from app.core.exceptions import ProcessingError, AudioProcessingError, Alignment
 from app.services.processors.core.base_processor import AsyncProcessor, ProcessingStage
 from utils.alignment_utils import find_exact_match, find_flexible_match
 from utils.gentle_utils import align_audio_with_transcript, filter_successful_words
-from utils.text_utils import split_transcript, create_text_over_item, normalize_text
+from utils.text_utils import (
+    _fallback_split,
+    create_text_over_item,
+    normalize_text,
+    split_transcript,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _dump_json(path: str, data, indent=None) -> None:
+    """Ghi data ra file JSON (UTF-8); gọi qua asyncio.to_thread"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+
+
 class TranscriptProcessor(AsyncProcessor):
     """
     Xử lý transcript và tạo text overlay với timing chính xác.
@@ -224,10 +236,278 @@ class TranscriptProcessor(AsyncProcessor):
         """
         return find_flexible_match(words, word_items, alignment_issues, max_lookahead)
 
+    async def process_segment(self, segment: Dict, temp_dir: str) -> bool:
+        """
+        Căn chỉnh transcript của một segment và gán kết quả vào 'text_over'.
+
+        Args:
+            segment: Segment cần xử lý (được cập nhật trực tiếp)
+            temp_dir: Thư mục tạm để lưu các file trung gian
+
+        Returns:
+            bool: True nếu segment được căn chỉnh thành công, False nếu bị bỏ qua
+
+        Raises:
+            AlignmentError: Nếu Gentle xử lý thất bại
+            AudioProcessingError: Nếu không thể tạo file tạm
+        """
+        segment_id = segment.get("id", "unknown")
+        processed = False
+
+        # Kiểm tra voice_over
+        voice_over = segment.get("voice_over")
+        if not voice_over:
+            self.logger.warning(
+                "Segment %s: Bỏ qua do thiếu voice_over", segment_id
+            )
+            return False
+
+        # Kiểm tra và xác thực file audio
+        voice_path = voice_over.get("local_path")
+
+        # Kiểm tra nội dung transcript
+        transcript_content = voice_over.get("content", "").strip()
+        if not transcript_content:
+            self.logger.warning(
+                "Segment %s: Bỏ qua do thiếu nội dung transcript",
+                segment_id,
+            )
+            return False
+        self.logger.debug(
+            "Segment %s: Đang phân đoạn transcript...", segment_id
+        )
+        try:
+            transcript_lines = await split_transcript(transcript_content)
+            try:
+                transcript_lines_file = os.path.join(
+                    temp_dir, f"{segment_id}_transcript_lines.json"
+                )
+                await asyncio.to_thread(
+                    _dump_json, transcript_lines_file, transcript_lines
+                )
+            except (IOError, OSError, TypeError, ValueError) as e:
+                self.logger.warning(
+                    "Không thể lưu transcript_lines: %s", str(e)
+                )
+
+        except (ValueError, json.JSONDecodeError, KeyError) as e:
+            self.logger.error(
+                "Segment %s: Lỗi khi phân đoạn transcript - %s",
+                segment_id,
+                str(e),
+                exc_info=True,
+            )
+            # Fallback: use simple split to preserve content
+            self.logger.warning(
+                "Segment %s: Sử dụng fallback để phân đoạn transcript",
+                segment_id
+            )
+            try:
+                transcript_lines = _fallback_split(transcript_content)
+                if not transcript_lines:
+                    # Last resort: use entire content as single segment
+                    transcript_lines = [transcript_content]
+            except Exception as fallback_error:
+                self.logger.error(
+                    "Segment %s: Fallback split cũng thất bại - %s",
+                    segment_id,
+                    str(fallback_error)
+                )
+                # Absolute last resort: use entire content
+                transcript_lines = [transcript_content]
+
+        try:
+            with tempfile.NamedTemporaryFile(
+                mode="w",
+                suffix=".txt",
+                delete=False,
+                dir=temp_dir,
+                encoding="utf-8",
+            ) as f:
+                f.write(transcript_content)
+                transcript_path = f.name
+
+            self.logger.debug(
+                "Segment %s: Đã tạo file transcript tạm: %s",
+                segment_id,
+                transcript_path,
+            )
+
+            # Handle gentle
+            gentle_url = settings.gentle_url
+            gentle_timeout = settings.gentle_timeout
+
+            self.logger.info("Sử dụng Gentle URL: %s", gentle_url)
+
+            try:
+                # Gentle is called with blocking requests (plus retry
+                # sleeps); keep the event loop free for the other segments
+                result, verification = await asyncio.to_thread(
+                    align_audio_with_transcript,
+                    audio_path=voice_path,
+                    transcript_path=transcript_path,
+                    gentle_url=gentle_url,
+                    timeout=gentle_timeout,
+                    min_success_ratio=0.8,
+                )
+                if not verification.get("is_verified"):
+                    self.logger.warning(
+                        "Aligned segment %s: Failed alignment - %s",
+                        segment_id,
+                        str(verification.get("success_ratio")),
+                    )
+                    return False
+                try:
+                    # Tạo tên file đầu ra dựa trên segment_id
+                    words_output_file = os.path.join(
+                        temp_dir, f"{segment_id}_words.json"
+                    )
+
+                    # Ghi dữ liệu vào file (ngoài event loop: kết quả Gentle
+                    # kèm phones của từng từ có thể khá lớn)
+                    await asyncio.to_thread(
+                        _dump_json, words_output_file, result, indent=2
+                    )
+
+                    self.logger.debug(
+                        "Aligned segment %s: Saved words to file: %s",
+                        segment_id,
+                        words_output_file,
+                    )
+                except (
+                    IOError,
+                    OSError,
+                    TypeError,
+                    ValueError,
+                ) as save_error:
+                    self.logger.warning(
+                        "Không thể lưu words: %s", str(save_error)
+                    )
+
+                self.logger.debug(
+                    "Aligned segment %s: %d/%d",
+                    segment_id,
+                    verification.get("success_count"),
+                    verification.get("total_words"),
+                )
+                if len(verification.get("alignment_issues")) > 0:
+                    self.logger.warning(
+                        "Aligned segment %s: %d issues:\n%s",
+                        segment_id,
+                        len(verification.get("alignment_issues")),
+                        "\n".join(
+                            [
+                                f"{issue['word']} ({issue['case']})"
+                                for issue in verification.get(
+                                    "alignment_issues"
+                                )
+                            ]
+                        ),
+                    )
+                word_items = result.get("words")
+                try:
+                    text_over_result = self._find_word_groups(
+                        word_items,
+                        transcript_lines,
+                        verification.get("alignment_issues"),
+                    )
+                    segment["text_over"] = text_over_result
+
+                    try:
+                        text_over_output_file = os.path.join(
+                            temp_dir, f"{segment_id}_text_over.json"
+                        )
+
+                        await asyncio.to_thread(
+                            _dump_json,
+                            text_over_output_file,
+                            text_over_result,
+                            indent=2,
+                        )
+
+                        self.logger.debug(
+                            "Aligned segment %s: Saved text_over to file: %s",
+                            segment_id,
+                            text_over_output_file,
+                        )
+                    except (
+                        IOError,
+                        OSError,
+                        TypeError,
+                        ValueError,
+                    ) as save_error:
+                        self.logger.warning(
+                            "Aligned segment %s: Failed to save text_over: %s",
+                            segment_id,
+                            str(save_error),
+                        )
+
+                    self.logger.info(
+                        "Aligned segment %s: Created %d text_over items",
+                        segment_id,
+                        len(text_over_result),
+                    )
+                    processed = True
+
+                except (RuntimeError, ValueError, TypeError) as e:
+                    self.logger.error(
+                        "Aligned segment %s: Failed to create text_over - %s",
+                        segment_id,
+                        str(e),
+                        exc_info=True,
+                    )
+                    raise RuntimeError(
+                        f"Aligned segment {segment_id}: Failed to create text_over"
+                    ) from e
+
+            except (
+                ValueError,
+                json.JSONDecodeError,
+                KeyError,
+                AttributeError,
+                requests.exceptions.RequestException,
+            ) as e:
+                self.logger.info(
+                    "Aligned segment %s: Aligning with Gentle (timeout: %s giây)...",
+                    segment_id,
+                    gentle_timeout,
+                )
+                self.logger.error(
+                    "Aligned segment %s: Failed to align with Gentle - %s",
+                    segment_id,
+                    str(e),
+                    exc_info=True,
+                )
+                raise AlignmentError(
+                    f"Lỗi khi xử lý với Gentle cho segment {segment_id}",
+                    alignment_data={
+                        "segment_id": segment_id,
+                        "error": str(e),
+                    },
+                ) from e
+
+        except (IOError, OSError) as e:
+            self.logger.error(
+                "Aligned segment %s: Failed to create temporary file - %s",
+                segment_id,
+                str(e),
+                exc_info=True,
+            )
+            raise AudioProcessingError(
+                f"Aligned segment {segment_id}: Failed to process temporary file",
+                file_path=voice_path,
+            ) from e
+
+        self.logger.debug("Aligned segment %s: Completed", segment_id)
+        return processed
+
     async def process(self, input_data: List[Dict], **kwargs) -> List[Dict]:
         """
         Xử lý transcript và tạo text overlay với timing chính xác.
 
+        Chỉ dùng khi gọi trực tiếp như thư viện: pipeline căn chỉnh transcript
+        qua SegmentPreparationProcessor, gọi process_segment cho từng segment.
+
         Args:
             input_data: Danh sách các segment cần xử lý, mỗi segment phải chứa:
                 - id: Định danh duy nhất của segment
@@ -274,249 +554,8 @@ class TranscriptProcessor(AsyncProcessor):
                     "[%d/%d] Đang xử lý segment %s", idx, len(input_data), segment_id
                 )
 
-                # Kiểm tra voice_over
-                voice_over = segment.get("voice_over")
-                if not voice_over:
-                    self.logger.warning(
-                        "Segment %s: Bỏ qua do thiếu voice_over", segment_id
-                    )
-                    continue
-
-                # Kiểm tra và xác thực file audio
-                voice_path = voice_over.get("local_path")
-
-                # Kiểm tra nội dung transcript
-                transcript_content = voice_over.get("content", "").strip()
-                if not transcript_content:
-                    self.logger.warning(
-                        "Segment %s: Bỏ qua do thiếu nội dung transcript",
-                        segment_id,
-                    )
-                    continue
-                self.logger.debug(
-                    "Segment %s: Đang phân đoạn transcript...", segment_id
-                )
-                try:
-                    transcript_lines = await split_transcript(transcript_content)
-                    try:
-                        transcript_lines_file = os.path.join(
-                            temp_dir, f"{segment_id}_transcript_lines.json"
-                        )
-                        with open(transcript_lines_file, "w", encoding="utf-8") as f:
-                            json.dump(transcript_lines, f, ensure_ascii=False)
-                    except (IOError, OSError, TypeError, ValueError) as e:
-                        self.logger.warning(
-                            "Không thể lưu transcript_lines: %s", str(e)
-                        )
-
-                except (ValueError, json.JSONDecodeError, KeyError) as e:
-                    self.logger.error(
-                        "Segment %s: Lỗi khi phân đoạn transcript - %s",
-                        segment_id,
-                        str(e),
-                        exc_info=True,
-                    )
-                    # Fallback: use simple split to preserve content
-                    self.logger.warning(
-                        "Segment %s: Sử dụng fallback để phân đoạn transcript",
-                        segment_id
-                    )
-                    try:
-                        from utils.text_utils import _fallback_split
-                        transcript_lines = _fallback_split(transcript_content)
-                        if not transcript_lines:
-                            # Last resort: use entire content as single segment
-                            transcript_lines = [transcript_content]
-                    except Exception as fallback_error:
-                        self.logger.error(
-                            "Segment %s: Fallback split cũng thất bại - %s",
-                            segment_id,
-                            str(fallback_error)
-                        )
-                        # Absolute last resort: use entire content
-                        transcript_lines = [transcript_content]
-
-                try:
-                    with tempfile.NamedTemporaryFile(
-                        mode="w",
-                        suffix=".txt",
-                        delete=False,
-                        dir=temp_dir,
-                        encoding="utf-8",
-                    ) as f:
-                        f.write(transcript_content)
-                        transcript_path = f.name
-
-                    self.logger.debug(
-                        "Segment %s: Đã tạo file transcript tạm: %s",
-                        segment_id,
-                        transcript_path,
-                    )
-
-                    # Handle gentle
-                    gentle_url = settings.gentle_url
-                    gentle_timeout = settings.gentle_timeout
-
-                    self.logger.info("Sử dụng Gentle URL: %s", gentle_url)
-
-                    try:
-                        result, verification = align_audio_with_transcript(
-                            audio_path=voice_path,
-                            transcript_path=transcript_path,
-                            gentle_url=gentle_url,
-                            timeout=gentle_timeout,
-                            min_success_ratio=0.8,
-                        )
-                        if not verification.get("is_verified"):
-                            self.logger.warning(
-                                "Aligned segment %s: Failed alignment - %s",
-                                segment_id,
-                                str(verification.get("success_ratio")),
-                            )
-                            continue
-                        try:
-                            # Tạo tên file đầu ra dựa trên segment_id
-                            words_output_file = os.path.join(
-                                temp_dir, f"{segment_id}_words.json"
-                            )
-
-                            # Ghi dữ liệu vào file
-                            with open(words_output_file, "w", encoding="utf-8") as f:
-                                json.dump(result, f, ensure_ascii=False, indent=2)
-
-                            self.logger.debug(
-                                "Aligned segment %s: Saved words to file: %s",
-                                segment_id,
-                                words_output_file,
-                            )
-                        except (
-                            IOError,
-                            OSError,
-                            TypeError,
-                            ValueError,
-                        ) as save_error:
-                            self.logger.warning(
-                                "Không thể lưu words: %s", str(save_error)
-                            )
-
-                        self.logger.debug(
-                            "Aligned segment %s: %d/%d",
-                            segment_id,
-                            verification.get("success_count"),
-                            verification.get("total_words"),
-                        )
-                        if len(verification.get("alignment_issues")) > 0:
-                            self.logger.warning(
-                                "Aligned segment %s: %d issues:\n%s",
-                                segment_id,
-                                len(verification.get("alignment_issues")),
-                                "\n".join(
-                                    [
-                                        f"{issue['word']} ({issue['case']})"
-                                        for issue in verification.get(
-                                            "alignment_issues"
-                                        )
-                                    ]
-                                ),
-                            )
-                        word_items = result.get("words")
-                        try:
-                            text_over_result = self._find_word_groups(
-                                word_items,
-                                transcript_lines,
-                                verification.get("alignment_issues"),
-                            )
-                            segment["text_over"] = text_over_result
-
-                            try:
-                                text_over_output_file = os.path.join(
-                                    temp_dir, f"{segment_id}_text_over.json"
-                                )
-
-                                with open(
-                                    text_over_output_file, "w", encoding="utf-8"
-                                ) as f:
-                                    json.dump(
-                                        text_over_result,
-                                        f,
-                                        ensure_ascii=False,
-                                        indent=2,
-                                    )
-
-                                self.logger.debug(
-                                    "Aligned segment %s: Saved text_over to file: %s",
-                                    segment_id,
-                                    text_over_output_file,
-                                )
-                            except (
-                                IOError,
-                                OSError,
-                                TypeError,
-                                ValueError,
-                            ) as save_error:
-                                self.logger.warning(
-                                    "Aligned segment %s: Failed to save text_over: %s",
-                                    segment_id,
-                                    str(save_error),
-                                )
-
-                            self.logger.info(
-                                "Aligned segment %s: Created %d text_over items",
-                                segment_id,
-                                len(text_over_result),
-                            )
-                            processed_count += 1
-
-                        except (RuntimeError, ValueError, TypeError) as e:
-                            self.logger.error(
-                                "Aligned segment %s: Failed to create text_over - %s",
-                                segment_id,
-                                str(e),
-                                exc_info=True,
-                            )
-                            raise RuntimeError(
-                                f"Aligned segment {segment_id}: Failed to create text_over"
-                            ) from e
-
-                    except (
-                        ValueError,
-                        json.JSONDecodeError,
-                        KeyError,
-                        AttributeError,
-                        requests.exceptions.RequestException,
-                    ) as e:
-                        self.logger.info(
-                            "Aligned segment %s: Aligning with Gentle (timeout: %s giây)...",
-                            segment_id,
-                            gentle_timeout,
-                        )
-                        self.logger.error(
-                            "Aligned segment %s: Failed to align with Gentle - %s",
-                            segment_id,
-                            str(e),
-                            exc_info=True,
-                        )
-                        raise AlignmentError(
-                            f"Lỗi khi xử lý với Gentle cho segment {segment_id}",
-                            alignment_data={
-                                "segment_id": segment_id,
-                                "error": str(e),
-                            },
-                        ) from e
-
-                except (IOError, OSError) as e:
-                    self.logger.error(
-                        "Aligned segment %s: Failed to create temporary file - %s",
-                        segment_id,
-                        str(e),
-                        exc_info=True,
-                    )
-                    raise AudioProcessingError(
-                        f"Aligned segment {segment_id}: Failed to process temporary file",
-                        file_path=voice_path,
-                    ) from e
-
-                self.logger.debug("Aligned segment %s: Completed", segment_id)
+                if await self.process_segment(segment, temp_dir):
+                    processed_count += 1
 
             total_time = time.time() - start_time
             avg_time = total_time / len(input_data) if input_data else 0
@@ -7,7 +7,7 @@ including basic validation and AI-assisted schema validation.
 
 from app.interfaces.validation import IValidator, ValidationResult
 from .basic_validation import BasicValidator
-from .schema_validation import SchemaValidator
+from .schema_validation import SchemaValidator, get_schema_validator
 from .processor import ValidationProcessor
 
 # Re-export types for easier imports
@@ -18,6 +18,7 @@ __all__ = [
     # Concrete validators
     "BasicValidator",
     "SchemaValidator",
+    "get_schema_validator",
     # Main processor
     "ValidationProcessor",
 ]
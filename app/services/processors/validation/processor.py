@@ -6,19 +6,38 @@ as other processors in the system for consistency.
 """
 
 import logging
-from typing import Any, List, TypeVar
+from typing import Any, Dict, List, TypeVar
 
 from app.services.processors.core.base_processor import AsyncProcessor
 from app.interfaces.validation import IValidator, ValidationResult
 from app.services.processors.core.metrics import ProcessingStage
 
-from .schema_validation import SchemaValidator
+from .schema_validation import get_schema_validator
 from .basic_validation import BasicValidator
 
 T = TypeVar("T")
 
 logger = logging.getLogger(__name__)
 
+# Stateless validator shared by every processor instance
+_BASIC_VALIDATOR = BasicValidator()
+
+
+def _publish_request_fields(context: Any, data: Dict[str, Any]) -> None:
+    """Extract the top-level request fields into the context in one pass.
+
+    Later stages read these keys from the context instead of walking the
+    request again; the values come from the validated (possibly normalized)
+    data rather than the raw payload.
+    """
+    segments = data.get("segments") or []
+    context.set("segments", segments)
+    context.set("transitions", data.get("transitions") or [])
+    context.set("background_music", data.get("background_music"))
+    context.set("keywords", data.get("keywords") or [])
+    context.set("upload", data.get("upload", True))
+    context.num_segments = len(segments)
+
 
 class ValidationProcessor(AsyncProcessor):
     """A processor that chains multiple validators together and executes them sequentially.
@@ -35,8 +54,8 @@ class ValidationProcessor(AsyncProcessor):
         """Initialize the ValidationProcessor with default validators."""
         super().__init__()
         self.validators: List[IValidator] = [
-            BasicValidator(),
-            SchemaValidator(),
+            _BASIC_VALIDATOR,
+            get_schema_validator(),
         ]
 
     async def process(self, input_data: Any, **kwargs) -> Any:
@@ -63,8 +82,14 @@ class ValidationProcessor(AsyncProcessor):
                 # Increment error counter
                 self._end_processing(metric, success=False, error_message=error_msg)
                 raise ValueError(error_msg)
+            validated_data = result.validated_data
+
+            context = kwargs.get("context")
+            if context is not None and isinstance(validated_data, dict):
+                _publish_request_fields(context, validated_data)
+
             self._end_processing(metric, success=True)
-            return result.validated_data
+            return validated_data
         except Exception as e:
             self._end_processing(metric, success=False, error_message=str(e))
             raise
@@ -5,6 +5,7 @@ This module provides AI-powered validation using PydanticAI Agent, allowing for
 complex validation logic that goes beyond static schema validation.
 """
 
+import functools
 import json
 import logging
 import os
@@ -69,6 +70,10 @@ class SchemaValidator:
         # Sử dụng đường dẫn schema từ cấu hình settings
         self.schema_path = schema_path or os.path.abspath(settings.schema_path)
         self.schema = self._load_schema()
+        # The schema never changes after loading, so its prompt text is
+        # serialized once here instead of on every validation call
+        self._schema_json = json.dumps(self.schema, indent=2)
+        self._required_fields_text = self._format_required_fields(self.schema)
 
         # System prompt defines the agent's role and basic behavior
         prompt_parts = [
@@ -130,6 +135,17 @@ class SchemaValidator:
             )
             raise e
 
+    @staticmethod
+    def _format_required_fields(schema: dict) -> str:
+        """List top-level and segment required fields for the validation prompt."""
+        required_fields = list(schema.get("required", []))
+        segments_schema = schema.get("properties", {}).get("segments", {})
+        segment_required = segments_schema.get("items", {}).get("required", [])
+        required_fields.extend(f"segments[].{field}" for field in segment_required)
+        if not required_fields:
+            return "- No required fields defined in schema"
+        return "\n".join(f"- {field}" for field in required_fields)
+
     async def validate_async(self, data: Any) -> ValidationResult[Dict[str, Any]]:
         """Validate data against the schema asynchronously using PydanticAI Agent.
 
@@ -173,22 +189,8 @@ class SchemaValidator:
         try:
             # Convert data to JSON string for AI validation
             input_data = json.dumps(data, ensure_ascii=False, indent=2)
-            schema_json = json.dumps(self.schema, indent=2)
-            
-            # Extract required fields from schema for explicit instruction
-            required_fields = []
-            if isinstance(self.schema, dict):
-                # Top-level required fields
-                if 'required' in self.schema:
-                    required_fields.extend(self.schema['required'])
-                
-                # Segment required fields
-                segments_schema = self.schema.get('properties', {}).get('segments', {})
-                if 'items' in segments_schema and 'required' in segments_schema['items']:
-                    segment_required = segments_schema['items']['required']
-                    required_fields.extend([f"segments[].{field}" for field in segment_required])
-            
-            required_fields_text = "\n".join([f"- {field}" for field in required_fields]) if required_fields else "- No required fields defined in schema"
+            schema_json = self._schema_json
+            required_fields_text = self._required_fields_text
 
             # Create validation prompt with schema and data
             prompt = (
@@ -276,3 +278,20 @@ class SchemaValidator:
             len(result.errors) if result.errors else 0,
         )
         return result
+
+
+@functools.lru_cache(maxsize=None)
+def get_schema_validator(schema_path: Optional[str] = None) -> SchemaValidator:
+    """Return a shared SchemaValidator for the given schema path.
+
+    Building a validator reads the schema file and creates the AI agent, so
+    instances are cached per schema path. Validators hold no per-request state,
+    which makes them safe to share across pipelines.
+
+    Args:
+        schema_path: Path to the JSON schema file. Defaults to settings.schema_path.
+
+    Returns:
+        SchemaValidator: The cached validator instance.
+    """
+    return SchemaValidator(schema_path=schema_path)
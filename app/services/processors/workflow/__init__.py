@@ -0,0 +1,14 @@
+"""
+Workflow processing components.
+
+This module contains processors that orchestrate several per-segment
+processors as a single pipeline stage.
+"""
+
+from .prepare import SegmentPreparationProcessor
+from .stream import SegmentStreamProcessor
+
+__all__ = [
+    "SegmentPreparationProcessor",
+    "SegmentStreamProcessor",
+]
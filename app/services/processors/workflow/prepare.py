@@ -0,0 +1,113 @@
+"""
+Segment preparation processor combining image validation and transcript alignment.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.exceptions import ProcessingError
+from app.services.processors.core.base_processor import (
+    AsyncProcessor,
+    ProcessingStage,
+    ProcessorBase,
+)
+from app.services.processors.core.metrics import MetricsCollector
+from app.services.processors.media.image.processor import ImageProcessor
+from app.services.processors.text.transcript import TranscriptProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class SegmentPreparationProcessor(AsyncProcessor):
+    """
+    Prepares downloaded segments for clip creation in a single pass.
+
+    Each segment goes through image validation/replacement and transcript
+    alignment before the next segment is started, instead of running two
+    separate stages that each walk the whole segment list.
+    """
+
+    def __init__(self, metrics_collector: Optional[MetricsCollector] = None):
+        super().__init__(metrics_collector)
+        self.image_processor = ImageProcessor(self.metrics_collector)
+        self.transcript_processor = TranscriptProcessor(self.metrics_collector)
+
+    def _child_processors(self) -> Iterable[ProcessorBase]:
+        return (self.image_processor, self.transcript_processor)
+
+    async def prepare_segment(
+        self,
+        segment: Dict[str, Any],
+        temp_dir: str,
+        keywords: Optional[List[str]],
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Run image validation and transcript alignment on a single segment.
+
+        Args:
+            segment: Segment with downloaded asset local paths
+            temp_dir: Temporary directory for intermediate files
+            keywords: Keywords from the request used for image search
+
+        Returns:
+            Tuple of (prepared segment, whether its transcript was aligned)
+        """
+        prepared = await self.image_processor.process_segment(
+            segment, temp_dir, keywords
+        )
+        aligned = await self.transcript_processor.process_segment(prepared, temp_dir)
+        return prepared, aligned
+
+    async def process(self, input_data: List[Dict[str, Any]], **kwargs) -> List[Dict]:
+        """Validate images and align transcripts for every segment.
+
+        Library entry point only: the pipeline prepares segments through
+        SegmentStreamProcessor, which calls prepare_segment per segment.
+
+        Args:
+            input_data: download_results (list of segments with local paths)
+            **kwargs: Additional parameters, must contain 'context'
+
+        Returns:
+            List of prepared segments with valid images and 'text_over' entries
+
+        Raises:
+            ProcessingError: If image replacement or transcript alignment fails
+        """
+        metric = self._start_processing(ProcessingStage.PROCESSING)
+        try:
+            context = kwargs.get("context")
+            if not context:
+                raise ProcessingError("Context is required for segment preparation")
+            temp_dir = context.temp_dir
+            if not temp_dir:
+                raise ProcessingError("temp_dir is required in context")
+            if not input_data:
+                raise ProcessingError("Invalid download results format")
+
+            keywords = context.get("keywords")
+            total = len(input_data)
+            aligned_count = 0
+
+            prepared_segments = []
+            for idx, segment in enumerate(input_data, 1):
+                self.logger.info(
+                    "[%d/%d] Preparing segment %s", idx, total, segment.get("id")
+                )
+                prepared, aligned = await self.prepare_segment(
+                    segment, temp_dir, keywords
+                )
+                if aligned:
+                    aligned_count += 1
+                prepared_segments.append(prepared)
+
+            self.logger.info(
+                "Prepared %d segments (%d with aligned transcript)",
+                total,
+                aligned_count,
+            )
+            self._end_processing(metric, success=True, items_processed=total)
+            return prepared_segments
+
+        except Exception as e:
+            self._end_processing(metric, success=False, error_message=str(e))
+            raise ProcessingError(f"Segment preparation failed: {e}") from e
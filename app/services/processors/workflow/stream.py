@@ -0,0 +1,136 @@
+"""
+Streaming processor that overlaps segment preparation with clip rendering.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config.settings import settings
+from app.core.exceptions import ProcessingError
+from app.services.processors.core.base_processor import (
+    AsyncProcessor,
+    ProcessingStage,
+    ProcessorBase,
+)
+from app.services.processors.core.metrics import MetricsCollector
+from app.services.processors.media.video.video_processor import VideoProcessor
+from app.services.processors.workflow.prepare import SegmentPreparationProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class SegmentStreamProcessor(AsyncProcessor):
+    """
+    Prepares segments and renders their clips as a bounded producer/consumer stream.
+
+    Preparation (image search, transcript alignment) is network-bound while
+    rendering is ffmpeg-bound, so upcoming segments are prepared while earlier
+    ones are being rendered. A bounded queue between the two keeps preparation
+    from running arbitrarily far ahead of rendering.
+    """
+
+    def __init__(self, metrics_collector: Optional[MetricsCollector] = None):
+        super().__init__(metrics_collector)
+        self.preparation_processor = SegmentPreparationProcessor(self.metrics_collector)
+        self.video_processor = VideoProcessor(self.metrics_collector)
+
+    def _child_processors(self) -> Iterable[ProcessorBase]:
+        return (self.preparation_processor, self.video_processor)
+
+    async def process(
+        self, input_data: List[Dict[str, Any]], **kwargs
+    ) -> List[Dict[str, str]]:
+        """Prepare every segment and render its clip.
+
+        Args:
+            input_data: download_results (list of segments with local paths)
+            **kwargs: Additional parameters, must contain 'context'
+
+        Returns:
+            List of clip info dicts with 'id' and 'path', in segment order
+
+        Raises:
+            ProcessingError: If preparing or rendering any segment fails
+        """
+        metric = self._start_processing(ProcessingStage.SEGMENT_CREATION)
+        try:
+            context = kwargs.get("context")
+            if not context:
+                raise ProcessingError("Context is required for segment streaming")
+            temp_dir = context.temp_dir
+            if not temp_dir:
+                raise ProcessingError("temp_dir is required in context")
+            if not input_data:
+                raise ProcessingError("No segments found to process")
+
+            keywords = context.get("keywords")
+            total = len(input_data)
+            worker_count = min(settings.segment_clip_concurrency, total)
+            queue: asyncio.Queue = asyncio.Queue(
+                maxsize=max(1, settings.pipeline_prefetch_segments)
+            )
+            prepared_segments: List[Optional[Dict[str, Any]]] = [None] * total
+            clip_results: List[Optional[Dict[str, str]]] = [None] * total
+
+            # Preparation waits on Gentle / image search, so a few segments
+            # are prepared at once; workers share one iterator over segments
+            pending = iter(enumerate(input_data))
+            prepare_count = max(1, min(settings.pipeline_prepare_concurrency, total))
+
+            async def prepare_worker():
+                for idx, segment in pending:
+                    self.logger.info(
+                        "[%d/%d] Preparing segment %s",
+                        idx + 1,
+                        total,
+                        segment.get("id"),
+                    )
+                    prepared, _ = await self.preparation_processor.prepare_segment(
+                        segment, temp_dir, keywords
+                    )
+                    prepared_segments[idx] = prepared
+                    # Blocks while the renderers are behind (back-pressure)
+                    await queue.put((idx, prepared))
+
+            async def prepare():
+                # A nested task group (not gather) so a failing worker also
+                # cancels its siblings instead of leaving them preparing
+                # segments for a failed job or blocked on a full queue
+                async with asyncio.TaskGroup() as prepare_tg:
+                    for _ in range(prepare_count):
+                        prepare_tg.create_task(prepare_worker())
+                # Sentinels only once every prepare worker has finished
+                for _ in range(worker_count):
+                    await queue.put(None)
+
+            async def render():
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        return
+                    idx, segment = item
+                    clip_results[idx] = await self.video_processor.process_segment(
+                        segment, temp_dir
+                    )
+
+            # The task group cancels the remaining tasks as soon as one fails
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    tg.create_task(prepare())
+                    for _ in range(worker_count):
+                        tg.create_task(render())
+            except ExceptionGroup as eg:
+                # Failures of prepare workers arrive nested in prepare()'s group
+                error = eg.exceptions[0]
+                while isinstance(error, ExceptionGroup):
+                    error = error.exceptions[0]
+                raise error from None
+
+            context.set("processed_segments", prepared_segments)
+            self._end_processing(metric, success=True, items_processed=total)
+            return clip_results
+
+        except Exception as e:
+            self._end_processing(metric, success=False, error_message=str(e))
+            raise ProcessingError(f"Segment streaming failed: {e}") from e
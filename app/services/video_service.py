@@ -3,12 +3,13 @@ Refactored video creation service with improved architecture
 """
 
 # Standard library imports
+import asyncio
+import functools
 import logging
 import os
 import time
 import uuid
-from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional
 
 # Third-party imports
 # (none currently)
@@ -20,15 +21,41 @@ from app.core.exceptions import (
     ProcessingError,
     VideoCreationError,
 )
-from app.services.pipelines import create_video_creation_pipeline
+from app.services.pipelines import VideoPipeline, create_video_creation_pipeline
 from app.services.pipelines.context.default import PipelineContext
+from app.services.processors.core.metrics import MetricsCollector
+from utils.download_utils import prune_asset_cache
 from utils.resource_manager import (
     cleanup_old_temp_directories,
     managed_temp_directory,
 )
+from utils.text_utils import prune_transcript_split_cache
+from utils.video_utils import get_video_encoder_args
 
 logger = logging.getLogger(__name__)
 
+# Exception type -> (log level, log message, error prefix, always log traceback)
+_ERROR_HANDLERS = {
+    DownloadError: (
+        logging.WARNING,
+        "Asset download failed",
+        "Asset download failed",
+        False,
+    ),
+    ProcessingError: (
+        logging.ERROR,
+        "Video processing failed",
+        "Video processing failed",
+        False,
+    ),
+    Exception: (
+        logging.ERROR,
+        "Unexpected error in video creation",
+        "Video creation failed",
+        True,
+    ),
+}
+
 
 class VideoCreationService:
     """
@@ -39,35 +66,105 @@ class VideoCreationService:
     """
 
     def __init__(self):
-        self._ensure_output_directory()
-        self._cleanup_old_directories()
+        self._ready = False
+        self._cleanup_task: Optional[asyncio.Task] = None
+        # Idle pipelines (each with its own metrics collector) reused across
+        # requests; concurrent jobs each take one, so no pipeline runs twice at once
+        self._pipeline_pool: List[VideoPipeline] = []
 
     def _ensure_output_directory(self):
         """Ensure output directory exists"""
-        output_dir = Path(settings.output_directory)
-        output_dir.mkdir(parents=True, exist_ok=True)
+        os.makedirs(settings.output_directory, exist_ok=True)
+
+    async def warmup(self) -> None:
+        """
+        Prepare filesystem state once, off the event loop.
+
+        Called from the application startup hook; create_video_from_json also
+        calls it so the service works when used without the FastAPI app.
+        """
+        if self._ready:
+            return
+        await asyncio.to_thread(self._ensure_output_directory)
+        # Probe the H.264 encoder now rather than inside the first render
+        await asyncio.to_thread(get_video_encoder_args)
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._janitor_loop())
+            self._cleanup_task.add_done_callback(self._on_janitor_done)
+        self._ready = True
+
+    async def shutdown(self) -> None:
+        """Stop the background temp directory janitor"""
+        task, self._cleanup_task = self._cleanup_task, None
+        self._ready = False
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
 
-    def _cleanup_old_directories(self):
-        """Clean up old temporary directories on startup"""
+    async def _janitor_loop(self) -> None:
+        """Remove old temp directories now and then every cleanup interval"""
+        interval = settings.temp_cleanup_interval_seconds
+        while True:
+            await self._cleanup_old_directories()
+            if interval <= 0:
+                return
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def _on_janitor_done(task: asyncio.Task) -> None:
+        """Log a janitor crash; nothing else awaits the task"""
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error(
+                "Temp directory janitor stopped: %s",
+                error,
+                exc_info=(type(error), error, error.__traceback__),
+            )
+
+    async def _cleanup_old_directories(self):
+        """Clean up old temporary directories and trim the caches off the event loop"""
         try:
-            cleanup_old_temp_directories()
+            await asyncio.to_thread(cleanup_old_temp_directories)
+            if settings.asset_cache_enabled:
+                await asyncio.to_thread(prune_asset_cache)
+            if settings.transcript_split_cache_enabled:
+                await asyncio.to_thread(prune_transcript_split_cache)
         except (OSError, PermissionError) as e:
             logger.warning(
-                "Failed to cleanup old temp directories on startup: %s",
+                "Failed to cleanup old temp directories: %s",
                 e,
                 exc_info=True,
             )
         except Exception as e:
+            # Nothing awaits this task, so log instead of re-raising
             logger.error(
                 "Unexpected error during temp directory cleanup: %s", e, exc_info=True
             )
-            # Vẫn ném lại exception để không che giấu lỗi nghiêm trọng
-            raise
+
+    def _acquire_pipeline(self) -> VideoPipeline:
+        """
+        Take an idle pipeline from the pool, resetting its metrics for reuse.
+
+        Building a pipeline imports and constructs every stage processor
+        (including the AI agents), so that cost is paid once per pooled
+        pipeline rather than once per request.
+        """
+        if not self._pipeline_pool:
+            return create_video_creation_pipeline(MetricsCollector())
+        pipeline = self._pipeline_pool.pop()
+        pipeline.metrics_collector.reset()
+        return pipeline
 
     async def create_video_from_json(self, json_data: Dict) -> Dict:
         """
         Create a video from JSON data with improved resource management and pipeline processing
         """
+        await self.warmup()
         video_id = uuid.uuid4().hex
 
         # Use async context manager for temporary directory
@@ -76,15 +173,26 @@ class VideoCreationService:
                 return await self._process_video_creation_pipeline(
                     json_data, temp_dir, video_id
                 )
-            except DownloadError as e:
-                logger.error("Asset download failed: %s", e, exc_info=True)
-                raise VideoCreationError(f"Asset download failed: {e}") from e
-            except ProcessingError as e:
-                logger.error("Video processing failed: %s", e, exc_info=True)
-                raise VideoCreationError(f"Video processing failed: {e}") from e
             except Exception as e:
-                logger.error("Unexpected error in video creation: %s", e, exc_info=True)
-                raise VideoCreationError(f"Video creation failed: {e}") from e
+                raise self._wrap_error(e) from e
+
+    @staticmethod
+    def _wrap_error(error: Exception) -> VideoCreationError:
+        """
+        Log a pipeline failure and wrap it in a VideoCreationError.
+
+        Expected failures skip traceback formatting unless DEBUG logging is on;
+        only unexpected errors always log the full traceback.
+        """
+        for exc_type in type(error).__mro__:
+            handler = _ERROR_HANDLERS.get(exc_type)
+            if handler is not None:
+                break
+        level, log_message, error_prefix, always_traceback = handler
+
+        exc_info = always_traceback or logger.isEnabledFor(logging.DEBUG)
+        logger.log(level, "%s: %s", log_message, error, exc_info=exc_info)
+        return VideoCreationError(f"{error_prefix}: {error}")
 
     async def _process_video_creation_pipeline(
         self, json_data: Dict, temp_dir: str, video_id: str
@@ -99,41 +207,54 @@ class VideoCreationService:
 
         Returns:
             Dict containing paths to the created video and its S3 URL
+            (None when the request disabled the upload)
 
         Raises:
             VideoCreationError: If video creation or upload fails
         """
-        # Create pipeline context
-        context_data = {
-            "json_data": json_data,
-            "segments": json_data.get("segments", []),
-            "transitions": json_data.get("transitions", []),
-            "background_music": json_data.get("background_music"),
-            "keywords": json_data.get("keywords", []),
-        }
+        # Top-level request fields are extracted once, from the validated
+        # data, by the request_validation stage
         context = PipelineContext(
-            data=context_data,
+            data={"json_data": json_data},
             temp_dir=temp_dir,
             video_id=video_id,
-            metadata={"start_time": time.time()},
+            metadata={"start_time_ns": time.perf_counter_ns()},
         )
 
-        # Create and execute pipeline
-        pipeline = create_video_creation_pipeline()
-        result = await pipeline.execute(context)
+        # Execute a pooled pipeline; only the context is per request
+        pipeline = self._acquire_pipeline()
+        try:
+            result = await pipeline.execute(context)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Pipeline metrics: %s", pipeline.metrics_collector.get_summary()
+                )
+        finally:
+            self._pipeline_pool.append(pipeline)
         context: PipelineContext = result.get("context")
 
         # Validate and return results
         final_video_path = context.get("final_video_path")
         s3_url = context.get("final_video_url")
 
-        if not final_video_path or not os.path.exists(final_video_path):
-            raise VideoCreationError("Final video was not created successfully")
-        if not s3_url:
+        try:
+            os.stat(final_video_path)
+        except (TypeError, FileNotFoundError):
+            raise VideoCreationError(
+                "Final video was not created successfully"
+            ) from None
+        if not s3_url and context.get("upload") is not False:
             raise VideoCreationError("S3 upload failed or S3 URL not found")
 
         return {"video_path": final_video_path, "s3_url": s3_url}
 
 
-# Create service instance
-video_service = VideoCreationService()
+@functools.lru_cache(maxsize=1)
+def get_video_service() -> VideoCreationService:
+    """
+    Return the shared service instance, creating it on first use.
+
+    Deferring construction keeps the output-directory setup and temp-directory
+    cleanup out of module import, so application startup does not wait on them.
+    """
+    return VideoCreationService()
@@ -0,0 +1,42 @@
+"""Unit tests for the voice over filter chain of AudioProcessor."""
+
+from app.services.processors.media.audio.processor import (
+    SEGMENT_AUDIO_SAMPLE_RATE,
+    AudioProcessor,
+)
+
+NORMALIZE_FILTERS = [
+    "loudnorm=I=-8:TP=-0.5:LRA=5",
+    f"aresample={SEGMENT_AUDIO_SAMPLE_RATE}",
+    "volume=2.0",
+]
+
+
+def test_without_delays_only_normalizes():
+    assert AudioProcessor.build_voice_over_filters({}) == NORMALIZE_FILTERS
+
+
+def test_delays_come_after_normalization():
+    filters = AudioProcessor.build_voice_over_filters(
+        {"start_delay": 0.5, "end_delay": 1.25}
+    )
+    # Padding last keeps the inserted silence out of loudnorm and volume
+    assert filters == NORMALIZE_FILTERS + [
+        "adelay=500|500",
+        "apad=pad_dur=1.25",
+    ]
+
+
+def test_resample_follows_loudnorm():
+    filters = AudioProcessor.build_voice_over_filters({"start_delay": 1})
+    # loudnorm outputs 192 kHz; the rest of the chain runs at the segment rate
+    assert filters.index(f"aresample={SEGMENT_AUDIO_SAMPLE_RATE}") == (
+        filters.index("loudnorm=I=-8:TP=-0.5:LRA=5") + 1
+    )
+
+
+def test_zero_and_string_delays():
+    filters = AudioProcessor.build_voice_over_filters(
+        {"start_delay": "0", "end_delay": "0.3"}
+    )
+    assert filters == NORMALIZE_FILTERS + ["apad=pad_dur=0.3"]
@@ -0,0 +1,118 @@
+"""Unit tests for SegmentStreamProcessor ordering and failure handling."""
+
+import asyncio
+
+import pytest
+
+from app.config.settings import settings
+from app.core.exceptions import ProcessingError
+from app.services.processors.workflow.stream import SegmentStreamProcessor
+
+
+class FakeContext:
+    def __init__(self, temp_dir):
+        self.temp_dir = temp_dir
+        self.values = {"keywords": ["test"]}
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    monkeypatch.setattr(settings, "ai_keyword_extraction_enabled", False)
+    monkeypatch.setattr(settings, "segment_clip_concurrency", 2)
+    monkeypatch.setattr(settings, "pipeline_prefetch_segments", 1)
+    monkeypatch.setattr(settings, "pipeline_prepare_concurrency", 2)
+    return SegmentStreamProcessor()
+
+
+def segments(count):
+    return [{"id": f"seg{i}"} for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_results_follow_segment_order(stream, monkeypatch, tmp_path):
+    async def prepare_segment(segment, temp_dir, keywords):
+        # Later segments finish preparing first
+        await asyncio.sleep(0.01 * (5 - int(segment["id"][3:])))
+        return {**segment, "prepared": True}, True
+
+    async def process_segment(segment, temp_dir):
+        await asyncio.sleep(0)
+        return {"id": segment["id"], "path": f"{temp_dir}/{segment['id']}.mkv"}
+
+    monkeypatch.setattr(stream.preparation_processor, "prepare_segment", prepare_segment)
+    monkeypatch.setattr(stream.video_processor, "process_segment", process_segment)
+    context = FakeContext(str(tmp_path))
+
+    clips = await stream.process(segments(5), context=context)
+
+    assert [clip["id"] for clip in clips] == [f"seg{i}" for i in range(5)]
+    assert [seg["id"] for seg in context.get("processed_segments")] == [
+        f"seg{i}" for i in range(5)
+    ]
+    assert all(seg["prepared"] for seg in context.get("processed_segments"))
+
+
+@pytest.mark.asyncio
+async def test_prepare_failure_cancels_sibling_workers(stream, monkeypatch, tmp_path):
+    cancelled = []
+    release = asyncio.Event()
+
+    async def prepare_segment(segment, temp_dir, keywords):
+        if segment["id"] == "seg1":
+            await asyncio.sleep(0)
+            raise RuntimeError("image search failed")
+        try:
+            await release.wait()
+        except asyncio.CancelledError:
+            cancelled.append(segment["id"])
+            raise
+        return segment, False
+
+    async def process_segment(segment, temp_dir):
+        raise AssertionError("nothing should be rendered")
+
+    monkeypatch.setattr(stream.preparation_processor, "prepare_segment", prepare_segment)
+    monkeypatch.setattr(stream.video_processor, "process_segment", process_segment)
+    context = FakeContext(str(tmp_path))
+
+    with pytest.raises(ProcessingError) as exc_info:
+        await asyncio.wait_for(stream.process(segments(3), context=context), 1)
+
+    assert cancelled == ["seg0"]
+    assert "processed_segments" not in context.values
+    # The nested ExceptionGroup is unwrapped to the original error
+    assert str(exc_info.value) == "Segment streaming failed: image search failed"
+    assert type(exc_info.value.__cause__) is RuntimeError
+
+
+@pytest.mark.asyncio
+async def test_render_failure_stops_preparation(stream, monkeypatch, tmp_path):
+    prepared = []
+
+    async def prepare_segment(segment, temp_dir, keywords):
+        prepared.append(segment["id"])
+        return segment, False
+
+    async def process_segment(segment, temp_dir):
+        if segment["id"] != "seg0":
+            await asyncio.sleep(10)
+        raise ProcessingError(f"ffmpeg failed for {segment['id']}")
+
+    monkeypatch.setattr(stream.preparation_processor, "prepare_segment", prepare_segment)
+    monkeypatch.setattr(stream.video_processor, "process_segment", process_segment)
+
+    with pytest.raises(ProcessingError) as exc_info:
+        await asyncio.wait_for(
+            stream.process(segments(20), context=FakeContext(str(tmp_path))), 1
+        )
+
+    assert str(exc_info.value) == "Segment streaming failed: ffmpeg failed for seg0"
+    assert not isinstance(exc_info.value.__cause__, ExceptionGroup)
+    # The bounded queue keeps preparation from running through every segment
+    assert len(prepared) < 20
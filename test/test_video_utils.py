@@ -0,0 +1,109 @@
+"""Unit tests for utils.video_utils command helpers."""
+
+import os
+
+import pytest
+
+from app.config.settings import settings
+from utils import video_utils
+from utils.video_utils import (
+    _concat_list_line,
+    get_gpu_scale_args,
+    get_video_decoder_args,
+    get_video_encoder_args,
+    with_software_encoder,
+)
+
+
+class TestConcatListLine:
+    def test_plain_path_is_quoted_and_absolute(self, tmp_path):
+        path = tmp_path / "temp_segment_1.mkv"
+        assert _concat_list_line(str(path)) == f"file '{path}'\n"
+
+    def test_relative_path_is_made_absolute(self):
+        line = _concat_list_line("clip.mkv")
+        assert line == f"file '{os.path.abspath('clip.mkv')}'\n"
+
+    def test_single_quote_closes_escapes_and_reopens_quoting(self, tmp_path):
+        path = tmp_path / "temp_segment_it's.mkv"
+        expected = str(path).replace("'", "'\\''")
+        assert _concat_list_line(str(path)) == f"file '{expected}'\n"
+
+    def test_every_single_quote_is_escaped(self):
+        line = _concat_list_line("/data/a'b'c.mkv")
+        assert line == "file '/data/a'\\''b'\\''c.mkv'\n"
+
+
+@pytest.fixture
+def nvenc(monkeypatch):
+    """Pretend a working NVENC GPU is present"""
+    monkeypatch.setattr(settings, "video_hw_encoding_enabled", True)
+    monkeypatch.setattr(video_utils, "_nvenc_available", lambda: True)
+
+
+class TestWithSoftwareEncoder:
+    def test_nvenc_encoder_args_become_default_codec(self, nvenc):
+        cmd = ["ffmpeg", "-i", "in.mp4", *get_video_encoder_args(), "out.mkv"]
+        assert with_software_encoder(cmd) == [
+            "ffmpeg",
+            "-i",
+            "in.mp4",
+            "-c:v",
+            settings.video_default_codec,
+            "out.mkv",
+        ]
+
+    def test_hwaccel_decoding_is_dropped(self, nvenc):
+        cmd = ["ffmpeg", *get_video_decoder_args(), "-i", "in.mp4", "out.mkv"]
+        assert get_video_decoder_args() == ["-hwaccel", "cuda"]
+        assert with_software_encoder(cmd) == ["ffmpeg", "-i", "in.mp4", "out.mkv"]
+
+    def test_gpu_frame_path_becomes_software_scale(self, nvenc):
+        gpu_args = get_gpu_scale_args(1920, 1080)
+        cmd = [
+            "ffmpeg",
+            "-y",
+            *gpu_args["input"],
+            "-i",
+            "in.mp4",
+            "-vf",
+            gpu_args["filter"],
+            *get_video_encoder_args(),
+            "out.mkv",
+        ]
+        assert with_software_encoder(cmd) == [
+            "ffmpeg",
+            "-y",
+            "-i",
+            "in.mp4",
+            "-vf",
+            "scale=1920:1080,format=yuv420p",
+            "-c:v",
+            settings.video_default_codec,
+            "out.mkv",
+        ]
+
+    def test_software_command_is_unchanged(self):
+        cmd = [
+            "ffmpeg",
+            "-i",
+            "in.mp4",
+            "-vf",
+            "scale=1920:1080,format=yuv420p",
+            "-c:v",
+            "libx264",
+            "-threads",
+            "2",
+            "out.mkv",
+        ]
+        assert with_software_encoder(cmd) == cmd
+
+    def test_partial_nvenc_sequence_is_kept(self):
+        # Only the full argument group built by get_video_encoder_args is rewritten
+        cmd = ["ffmpeg", "-i", "in.mp4", "-c:v", "h264_nvenc", "out.mkv"]
+        assert with_software_encoder(cmd) == cmd
+
+    def test_without_nvenc_gpu_helpers_are_disabled(self, monkeypatch):
+        monkeypatch.setattr(video_utils, "_nvenc_available", lambda: False)
+        assert get_video_decoder_args() == []
+        assert get_gpu_scale_args(1920, 1080) is None
@@ -129,8 +129,11 @@ def find_flexible_match(
                             )
                             break
 
-    # Sort found items by their original position in word_items
-    found_items.sort(key=lambda x: word_items.index(x) if x in word_items else 0)
+    # Sort found items by their original position in word_items; every found
+    # item is an object from search_items, so map positions by identity once
+    # instead of scanning word_items twice per sort key
+    positions = {id(item): idx for idx, item in enumerate(search_items)}
+    found_items.sort(key=lambda x: positions[id(x)])
 
     # Log missing words only if we found less than 30% of the words
     if remaining_words and len(found_items) < len(original_remaining) * 0.3:
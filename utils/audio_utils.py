@@ -6,8 +6,11 @@ Module này chứa các hàm hỗ trợ kiểm tra và xác thực file audio,
 """
 
 import logging
+import wave
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
+
+from utils.subprocess_utils import safe_subprocess_run
 
 # Khởi tạo logger
 audio_logger = logging.getLogger("audio_utils")
@@ -65,14 +68,54 @@ def validate_audio_file(audio_path: str) -> Tuple[bool, str]:
         return False, error_msg
 
 
+def read_wav_duration(audio_path: str) -> Optional[float]:
+    """
+    Đọc thời lượng file WAV PCM từ header (không chạy ffprobe).
+
+    Returns:
+        Thời lượng (giây), hoặc None nếu không phải WAV hoặc header không đọc được
+    """
+    if Path(audio_path).suffix.lower() != ".wav":
+        return None
+    try:
+        with wave.open(audio_path, "rb") as wav_file:
+            return wav_file.getnframes() / float(wav_file.getframerate())
+    except (wave.Error, EOFError, OSError) as e:
+        audio_logger.debug(
+            "Không đọc được header WAV %s, dùng ffprobe: %s", audio_path, e
+        )
+        return None
+
+
 def get_audio_duration(audio_path: str) -> float:
     """
     Lấy thời lượng của file audio (đơn vị: giây).
 
-    Note: Hiện tại chỉ trả về 0, cần tích hợp với thư viện đọc audio thực tế
+    File WAV PCM được đọc trực tiếp từ header, không cần chạy ffprobe;
+    các định dạng khác (hoặc WAV không đọc được) dùng ffprobe.
+
+    Raises:
+        SubprocessError: Nếu ffprobe chạy thất bại
+        ValueError: Nếu ffprobe không trả về thời lượng hợp lệ
     """
-    # TODO: Tích hợp với thư viện đọc audio (như librosa, pydub, ...)
-    return 0.0
+    duration = read_wav_duration(audio_path)
+    if duration is not None:
+        return duration
+
+    probe_cmd = [
+        "ffprobe",
+        "-v",
+        "quiet",
+        "-show_entries",
+        "format=duration",
+        "-of",
+        "csv=p=0",
+        audio_path,
+    ]
+    result = safe_subprocess_run(
+        probe_cmd, f"Get audio duration for {audio_path}", audio_logger
+    )
+    return float(result.stdout.strip())
 
 
 def is_audio_file(filename: str) -> bool:
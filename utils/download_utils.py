@@ -2,12 +2,18 @@
 Download utility functions.
 """
 
+import asyncio
+import functools
+import hashlib
 import logging
 import os
+import random
+import shutil
+import time
 import uuid
 from pathlib import Path
-from typing import Union
-from urllib.parse import urlparse
+from typing import Dict, Optional, Union
+from urllib.parse import urlparse, urlsplit, urlunsplit
 
 import aiofiles
 import aiohttp
@@ -17,6 +23,56 @@ from app.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Network chunks are coalesced into writes of this size, so each aiofiles
+# write (one thread-pool hop + one write syscall) moves a large block
+_WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Upper bound (seconds) for a single retry backoff / Retry-After wait
+_MAX_RETRY_DELAY = 30.0
+
+# Shared HTTP session: keep-alive connections and DNS cache are reused
+# across downloads instead of opening a new pool per file
+_session: Optional[aiohttp.ClientSession] = None
+
+# Cache downloads currently in progress, keyed by cache path
+_inflight_cache_downloads: Dict[str, "asyncio.Future[str]"] = {}
+# Number of callers awaiting each in-flight cache download
+_cache_fill_waiters: Dict["asyncio.Future[str]", int] = {}
+
+# Process-wide cap on in-flight transfers: each job bounds its own workers,
+# but concurrent jobs together would otherwise hold one buffered response
+# per connection in the pool
+_transfer_slots = asyncio.Semaphore(max(1, settings.download_global_max_concurrent))
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return the shared download session, creating it on first use"""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=settings.download_pool_limit,
+            limit_per_host=settings.download_pool_limit_per_host,
+            ttl_dns_cache=300,
+            keepalive_timeout=75,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=settings.download_timeout),
+            # Media is already compressed: ask for the raw bytes so no CPU is
+            # spent inflating a gzip'd transfer (a server that compresses
+            # anyway is still decoded by aiohttp)
+            headers={"Accept-Encoding": "identity"},
+        )
+    return _session
+
+
+async def close_http_session() -> None:
+    """Close the shared download session (application shutdown)"""
+    global _session
+    session, _session = _session, None
+    if session is not None and not session.closed:
+        await session.close()
+
 
 async def download_file(url: str, destination: Union[str, Path], **kwargs) -> str:
     """
@@ -51,42 +107,277 @@ async def download_file(url: str, destination: Union[str, Path], **kwargs) -> st
         logger.debug("File already exists, skipping download: %s", dest_path)
         return dest_path
 
-    # Download the file
-    result = await _download_file_internal(url, dest_path)
+    if settings.asset_cache_enabled:
+        cache_path = await _download_to_cache(url)
+        _link_or_copy(cache_path, dest_path)
+        return dest_path
+
+    # Download the file under a unique temp name and rename it into place, so
+    # concurrent callers fetching the same URL never interleave writes
+    partial_path = f"{dest_path}.{uuid.uuid4().hex}.part"
+    result = await _download_file_internal(url, partial_path)
     if not result["success"]:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
         raise VideoCreationError(f"Failed to download {url}: {result['error']}")
+    os.replace(partial_path, dest_path)
 
     return dest_path
 
 
-async def _download_file_internal(url: str, dest_path: str) -> dict:
-    """Internal function to download a single file"""
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for deduplication and cache keys.
+
+    Lowercases scheme and host, drops a default port and the fragment (never
+    sent to the server); path and query are kept as-is since they select the
+    resource (e.g. signed URLs).
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    if ":" in netloc:
+        netloc = f"[{netloc}]"  # IPv6 literal
+    if parts.username or parts.password:
+        return urlunsplit((scheme, parts.netloc, parts.path, parts.query, ""))
+    if port is not None and port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{port}"
+    return urlunsplit((scheme, netloc, parts.path, parts.query, ""))
+
+
+def _asset_cache_path(url: str) -> str:
+    """Content-addressed cache location for a URL (sha256 of the URL + extension)"""
+    ext = os.path.splitext(urlparse(url).path)[1]
+    digest = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+    return os.path.join(settings.asset_cache_dir, f"{digest}{ext}")
+
+
+async def _download_to_cache(url: str) -> str:
+    """Return the cached file for url, downloading it on a cache miss"""
+    cache_path = _asset_cache_path(url)
+    now = time.time()
+    try:
+        # mtime is when the entry was downloaded: content behind a URL can
+        # change (e.g. a re-uploaded S3 object), so old entries are refetched
+        downloaded_at = os.stat(cache_path).st_mtime
+        if now - downloaded_at <= _asset_cache_max_age_seconds():
+            # Record the hit in atime (eviction order), keeping mtime
+            os.utime(cache_path, (now, downloaded_at))
+            logger.debug("Asset cache hit for %s", url)
+            return cache_path
+        logger.debug("Asset cache entry for %s expired, downloading again", url)
+    except FileNotFoundError:
+        pass
+
+    # Concurrent jobs missing the same URL share one transfer
+    pending = _inflight_cache_downloads.get(cache_path)
+    if pending is None:
+        pending = asyncio.ensure_future(_fill_cache_entry(url, cache_path))
+        _inflight_cache_downloads[cache_path] = pending
+        pending.add_done_callback(functools.partial(_on_cache_fill_done, cache_path))
+    else:
+        logger.debug("Joining in-flight download of %s", url)
+    _cache_fill_waiters[pending] = _cache_fill_waiters.get(pending, 0) + 1
+    try:
+        # shield: one caller being cancelled must not abort the others' download
+        return await asyncio.shield(pending)
+    finally:
+        _cache_fill_waiters[pending] -= 1
+        if not _cache_fill_waiters[pending]:
+            del _cache_fill_waiters[pending]
+            # Every caller was cancelled (e.g. their job failed): nobody
+            # wants the file any more, so stop the transfer
+            if not pending.done():
+                pending.cancel()
+
+
+def _on_cache_fill_done(cache_path: str, future: "asyncio.Future[str]") -> None:
+    """Forget a finished cache download"""
+    if _inflight_cache_downloads.get(cache_path) is future:
+        del _inflight_cache_downloads[cache_path]
+    if not future.cancelled():
+        # Mark the error as retrieved: a fill whose waiters were all
+        # cancelled would otherwise log "Future exception was never retrieved"
+        future.exception()
+
+
+async def _fill_cache_entry(url: str, cache_path: str) -> str:
+    """Download url into the asset cache at cache_path"""
+    # Download to a unique temp name and rename into place, so concurrent
+    # jobs never see a partially written cache entry
+    os.makedirs(settings.asset_cache_dir, exist_ok=True)
+    partial_path = f"{cache_path}.{uuid.uuid4().hex}.part"
+    try:
+        result = await _download_file_internal(url, partial_path)
+    except asyncio.CancelledError:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    if not result["success"]:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise VideoCreationError(f"Failed to download {url}: {result['error']}")
+    os.replace(partial_path, cache_path)
+    return cache_path
+
+
+def _link_or_copy(src: str, dest: str) -> None:
+    """Hardlink a cached asset into the job directory, copying across devices"""
+    if os.path.lexists(dest):
+        os.remove(dest)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+def _asset_cache_max_age_seconds() -> float:
+    """How long a downloaded asset is served from the cache"""
+    return settings.asset_cache_max_age_hours * 3600
+
+
+def prune_asset_cache() -> None:
+    """
+    Drop expired cache entries, then evict least recently used ones until
+    the cache fits its size limit
+    """
+    max_bytes = settings.asset_cache_max_mb * 1024 * 1024
+    now = time.time()
+    expired_before = now - _asset_cache_max_age_seconds()
+    # A download in progress writes its .part file at least once per
+    # download_timeout; older ones were left behind by a killed process
+    stale_before = now - settings.download_timeout
+    files = []
+    try:
+        with os.scandir(settings.asset_cache_dir) as entries:
+            for entry in entries:
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.endswith(".part"):
+                    # In-flight downloads are not cache entries: never evict
+                    # them (the final os.replace would fail) nor count them
+                    if stat.st_mtime < stale_before:
+                        _remove_cache_file(entry.path)
+                    continue
+                if stat.st_mtime < expired_before:
+                    # Would be downloaded again on the next hit anyway
+                    _remove_cache_file(entry.path)
+                    continue
+                # Hits update atime, so this sorts least recently used first
+                files.append((stat.st_atime, stat.st_size, entry.path))
+    except FileNotFoundError:
+        return
+
+    total = sum(size for _, size, _ in files)
+    if total <= max_bytes:
+        return
+    files.sort()
+    for _, size, path in files:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Failed to evict cached asset %s: %s", path, e)
+            continue
+        total -= size
+        if total <= max_bytes:
+            break
+    logger.info("Asset cache pruned to %.1f MB", total / (1024 * 1024))
+
+
+def _remove_cache_file(path: str) -> None:
+    """Remove an expired cache entry or an abandoned partial download"""
     try:
-        timeout = aiohttp.ClientTimeout(total=settings.download_timeout)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(url) as response:
-                response.raise_for_status()
-
-                # Create directory if it doesn't exist
-                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-
-                # Stream large files to avoid memory issues
-                async with aiofiles.open(dest_path, "wb") as f:
-                    async for chunk in response.content.iter_chunked(8192):
-                        await f.write(chunk)
-
-                logger.debug("✅ Downloaded %s to %s", url, dest_path)
-                return {"success": True, "local_path": dest_path}
-
-    except aiohttp.ClientError as e:
-        logger.error("Failed to download %s: %s", url, str(e))
-        return {"success": False, "error": f"Failed to download {url}: {e}"}
-    except (OSError, IOError) as e:
-        logger.error("File operation error downloading %s: %s", url, str(e))
-        return {
-            "success": False,
-            "error": f"File operation error downloading {url}: {e}",
-        }
-    except Exception as e:
-        logger.error("Unexpected error downloading %s: %s", url, str(e))
-        return {"success": False, "error": f"Unexpected error downloading {url}: {e}"}
+        os.remove(path)
+        logger.info("Removed stale asset cache file %s", path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("Failed to remove stale asset cache file %s: %s", path, e)
+
+
+def _retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """
+    Seconds to wait before retrying a failed transfer, or None if the error
+    is not transient (e.g. 404). Honors a numeric Retry-After header.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        if error.status != 429 and error.status < 500:
+            return None
+        retry_after = (error.headers or {}).get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), _MAX_RETRY_DELAY)
+    # Exponential backoff with jitter so parallel workers don't retry in lockstep
+    return min(_MAX_RETRY_DELAY, 2 ** (attempt - 1)) + random.random()
+
+
+async def _fetch_to_file(url: str, dest_path: str) -> None:
+    """Stream url into dest_path (one attempt)"""
+    async with _transfer_slots:
+        session = get_http_session()
+        async with session.get(url) as response:
+            response.raise_for_status()
+
+            # Create directory if it doesn't exist
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+
+            # Stream large files to avoid memory issues. iter_any() hands
+            # over whatever the socket has buffered (bounded by aiohttp's
+            # flow control) instead of re-slicing it into fixed chunks
+            async with aiofiles.open(dest_path, "wb") as f:
+                buffer = bytearray()
+                async for chunk in response.content.iter_any():
+                    buffer += chunk
+                    if len(buffer) >= _WRITE_BUFFER_SIZE:
+                        await f.write(buffer)
+                        buffer.clear()
+                if buffer:
+                    await f.write(buffer)
+
+
+async def _download_file_internal(url: str, dest_path: str) -> dict:
+    """Internal function to download a single file, retrying transient failures"""
+    attempts = max(1, settings.download_retry_attempts)
+    for attempt in range(1, attempts + 1):
+        try:
+            await _fetch_to_file(url, dest_path)
+            logger.debug("✅ Downloaded %s to %s", url, dest_path)
+            return {"success": True, "local_path": dest_path}
+
+        # asyncio.TimeoutError is an OSError subclass: handle it before OSError
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt == attempts:
+                logger.error("Failed to download %s: %s", url, str(e))
+                return {"success": False, "error": f"Failed to download {url}: {e}"}
+            logger.warning(
+                "Download of %s failed (%s), retrying in %.1fs (%d/%d)",
+                url,
+                str(e) or type(e).__name__,
+                delay,
+                attempt,
+                attempts,
+            )
+            # Sleep outside the transfer slot so other downloads can proceed
+            await asyncio.sleep(delay)
+        except (OSError, IOError) as e:
+            logger.error("File operation error downloading %s: %s", url, str(e))
+            return {
+                "success": False,
+                "error": f"File operation error downloading {url}: {e}",
+            }
+        except Exception as e:
+            logger.error("Unexpected error downloading %s: %s", url, str(e))
+            return {"success": False, "error": f"Unexpected error downloading {url}: {e}"}
@@ -7,14 +7,46 @@ import time
 import json
 import os
 import sys
-from typing import Dict, List, Tuple, Any
+import threading
+from contextlib import ExitStack
+from typing import Dict, List, Optional, Tuple, Any
 
 import logging
 import requests
+import requests.adapters
 
 logger = logging.getLogger(__name__)
 
 
+# Session dùng chung cho mọi segment: giữ kết nối keep-alive tới Gentle thay vì
+# bắt tay TCP mới cho mỗi lần gọi (các luồng worker dùng chung connection pool)
+_gentle_session: Optional[requests.Session] = None
+_gentle_session_lock = threading.Lock()
+
+# Số kết nối keep-alive giữ lại tới Gentle. Mặc định của requests là 10: khi
+# nhiều segment/job căn chỉnh cùng lúc, kết nối vượt quá bị huỷ sau mỗi lần
+# gọi và lần sau phải bắt tay lại
+_GENTLE_POOL_SIZE = 32
+
+
+def _get_gentle_session() -> requests.Session:
+    """Trả về session Gentle dùng chung, tạo khi dùng lần đầu"""
+    global _gentle_session
+    with _gentle_session_lock:
+        if _gentle_session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=_GENTLE_POOL_SIZE
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(
+                {"User-Agent": "Video-Create/1.0", "Accept": "application/json"}
+            )
+            _gentle_session = session
+        return _gentle_session
+
+
 class GentleAlignmentError(Exception):
     """Base exception for Gentle alignment errors."""
 
@@ -112,75 +144,69 @@ def align_audio_with_transcript(
 
     # Prepare files for upload
     for attempt in range(1, max_retries + 1):
-        audio_file = None
-        transcript_file = None
-        session = None
-
         try:
-            # Kiểm tra timeout tổng
-            elapsed = time.time() - start_time
-            if elapsed > timeout:
-                raise GentleAlignmentError(
-                    f"Total operation timeout of {timeout} seconds exceeded"
+            with ExitStack() as stack:
+                # Kiểm tra timeout tổng
+                elapsed = time.time() - start_time
+                if elapsed > timeout:
+                    raise GentleAlignmentError(
+                        f"Total operation timeout of {timeout} seconds exceeded"
+                    )
+
+                # Mở file trong mỗi lần thử để tránh file handle bị đóng;
+                # ExitStack đóng các file theo thứ tự ngược lại khi kết thúc
+                audio_file = stack.enter_context(open(audio_path, "rb"))
+                transcript_file = stack.enter_context(
+                    open(transcript_path, "r", encoding="utf-8")
                 )
 
-            # Mở file trong mỗi lần thử để tránh file handle bị đóng
-            audio_file = open(audio_path, "rb")
-            transcript_file = open(transcript_path, "r", encoding="utf-8")
-
-            files = {
-                "audio": (os.path.basename(audio_path), audio_file, "audio/mp3"),
-                "transcript": (os.path.basename(transcript_path), transcript_file),
-            }
-
-            # Tạo session mới cho mỗi lần thử
-            session = requests.Session()
-            session.headers.update(
-                {"User-Agent": "Video-Create/1.0", "Accept": "application/json"}
-            )
-
-            # Gửi request với timeout riêng
-            logger.info(
-                "Sending request to Gentle API (attempt %s/%s)", attempt, max_retries
-            )
-            logger.info("Gentle URL: %s", gentle_url)
-            logger.info(
-                "Audio file: %s (exists: %s)", audio_path, os.path.exists(audio_path)
-            )
-            logger.info(
-                "Transcript file: %s (exists: %s)",
-                transcript_path,
-                os.path.exists(transcript_path),
-            )
+                files = {
+                    "audio": (os.path.basename(audio_path), audio_file, "audio/mp3"),
+                    "transcript": (os.path.basename(transcript_path), transcript_file),
+                }
 
-            try:
-                response = session.post(
-                    f"{gentle_url}?async=false", files=files, timeout=request_timeout
+                # Gửi request với timeout riêng
+                logger.info(
+                    "Sending request to Gentle API (attempt %s/%s)", attempt, max_retries
                 )
-                logger.info("Gentle API response status: %s", response.status_code)
-                logger.debug("Response headers: %s", response.headers)
-
-                response.raise_for_status()
-                result = response.json()
-                logger.info("Successfully received response from Gentle API")
-                logger.debug(
-                    "Response sample: %s...",
-                    json.dumps(result)[:200] if result else "Empty response",
+                logger.info("Gentle URL: %s", gentle_url)
+                logger.info(
+                    "Audio file: %s (exists: %s)", audio_path, os.path.exists(audio_path)
                 )
-
-                # Xác minh kết quả
-                word_items = result.get("words", [])
-                verification_result = verify_alignment_quality(
-                    word_items, min_success_ratio=min_success_ratio
+                logger.info(
+                    "Transcript file: %s (exists: %s)",
+                    transcript_path,
+                    os.path.exists(transcript_path),
                 )
 
-                return result, verification_result
-
-            except Exception as e:
-                logger.error(
-                    "Error processing Gentle API response: %s", str(e), exc_info=True
-                )
-                raise
+                try:
+                    response = _get_gentle_session().post(
+                        f"{gentle_url}?async=false", files=files, timeout=request_timeout
+                    )
+                    logger.info("Gentle API response status: %s", response.status_code)
+                    logger.debug("Response headers: %s", response.headers)
+
+                    response.raise_for_status()
+                    result = response.json()
+                    logger.info("Successfully received response from Gentle API")
+                    logger.debug(
+                        "Response sample: %s...",
+                        json.dumps(result)[:200] if result else "Empty response",
+                    )
+
+                    # Xác minh kết quả
+                    word_items = result.get("words", [])
+                    verification_result = verify_alignment_quality(
+                        word_items, min_success_ratio=min_success_ratio
+                    )
+
+                    return result, verification_result
+
+                except Exception as e:
+                    logger.error(
+                        "Error processing Gentle API response: %s", str(e), exc_info=True
+                    )
+                    raise
 
         except requests.exceptions.Timeout as e:
             last_error = (
@@ -228,18 +254,9 @@ def align_audio_with_transcript(
                 ),
             )
 
-        finally:
-            # Đóng session và file handles
-            if session:
-                session.close()
-            if audio_file:
-                audio_file.close()
-            if transcript_file:
-                transcript_file.close()
-
-            # Nếu còn lần thử, chờ một chút trước khi thử lại
-            if attempt < max_retries:
-                time.sleep(retry_delay)
+        # Chỉ tới đây khi lần thử thất bại: chờ một chút trước khi thử lại
+        if attempt < max_retries:
+            time.sleep(retry_delay)
 
     # Nếu đến đây có nghĩa là đã hết số lần thử
     raise GentleAlignmentError(
@@ -6,6 +6,7 @@ for use in video creation pipelines.
 """
 
 import os
+import uuid
 from typing import List, Union, Optional, Tuple
 import cv2
 import numpy as np
@@ -26,6 +27,44 @@ cv2.COLOR_LAB2BGR = cv2.COLOR_LAB2BGR if hasattr(cv2, "COLOR_LAB2BGR") else 56
 cv2.COLOR_BGR2HSV = cv2.COLOR_BGR2HSV if hasattr(cv2, "COLOR_BGR2HSV") else 40
 cv2.COLOR_HSV2BGR = cv2.COLOR_HSV2BGR if hasattr(cv2, "COLOR_HSV2BGR") else 54
 
+# Lookup tables for per-pixel uint8 adjustments; cv2.LUT applies the
+# arithmetic, clipping and cast in a single pass without float temporaries
+_IDENTITY_LEVELS = np.arange(256, dtype=np.float64)
+_SATURATION_BOOST_LUT = np.clip(_IDENTITY_LEVELS * 1.2, 0, 255).astype(np.uint8)
+
+# Pixabay searches reuse one keep-alive connection pool instead of a new
+# TCP/TLS handshake per keyword (requests.Session is safe for these calls
+# from the worker threads that run them)
+_PIXABAY_SESSION = requests.Session()
+
+# Decode-time downscale factors -> imread flags (libjpeg-turbo DCT scaling)
+_REDUCED_READ_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+def _read_image_for_target(path: str, target_w: int, target_h: int) -> Optional[CV2Image]:
+    """
+    Đọc ảnh, giải mã ở độ phân giải giảm (1/2, 1/4, 1/8) nếu ảnh gốc lớn
+    hơn nhiều so với kích thước đích.
+
+    JPEG được scale ngay trong bước giải mã DCT nên nhanh hơn nhiều so với
+    giải mã đầy đủ rồi resize; ảnh đọc về vẫn không nhỏ hơn kích thước sau resize.
+    """
+    try:
+        with Image.open(path) as header:  # Chỉ đọc header, chưa giải mã
+            w, h = header.size
+    except (IOError, OSError, ValueError):
+        return cv2.imread(path)
+
+    max_factor = min(w / target_w, h / target_h)
+    for factor, flag in _REDUCED_READ_FLAGS:
+        if factor <= max_factor:
+            return cv2.imread(path, flag)
+    return cv2.imread(path)
+
 
 def get_smart_pad_color(
     img: np.ndarray, method: str = "average_edge"
@@ -116,6 +155,7 @@ def process_image(
     enhance_sharpness: bool = False,
     output_dir: Optional[str] = None,
     return_arrays: bool = False,
+    reuse_existing: bool = False,
 ) -> Union[List, List[str]]:
     """
     Load, resize và padding ảnh về đúng target_size (w, h), giữ nguyên tỉ lệ.
@@ -133,6 +173,8 @@ def process_image(
         enhance_sharpness: Tự động làm sắc nét ảnh
         output_dir: Thư mục lưu ảnh đã xử lý (nếu None thì trả về numpy arrays)
         return_arrays: Nếu True, trả về numpy arrays thay vì đường dẫn file
+        reuse_existing: Nếu True (khi lưu vào output_dir), dùng lại ảnh đã xử lý
+            sẵn có trong output_dir thay vì giải mã và xử lý lại
 
     Returns:
         List numpy arrays (nếu output_dir=None hoặc return_arrays=True)
@@ -150,8 +192,26 @@ def process_image(
     target_w = target_w - (target_w % 2)
     target_h = target_h - (target_h % 2)
 
+    save_to_dir = bool(output_dir) and not return_arrays
+    if save_to_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
     for _, path in enumerate(image_paths):
-        img = cv2.imread(path)
+        if save_to_dir:
+            # Generate output filename. Uncompressed BMP: ffmpeg's looped
+            # image input decodes the file again for every output frame, and
+            # a BMP "decode" is a plain copy instead of a JPEG decode (the
+            # frame also skips a lossy JPEG round trip)
+            name_without_ext = os.path.splitext(os.path.basename(path))[0]
+            processed_path = os.path.join(
+                output_dir, f"processed_{name_without_ext}.bmp"
+            )
+            # Segments sharing a background image reuse the first result
+            if reuse_existing and os.path.exists(processed_path):
+                processed_paths.append(processed_path)
+                continue
+
+        img = _read_image_for_target(path, target_w, target_h)
         if img is None:
             raise FileNotFoundError(f"Image not found or unreadable: {path}")
 
@@ -180,40 +240,40 @@ def process_image(
         pad_top = (target_h - new_h) // 2
         pad_bottom = target_h - new_h - pad_top
 
-        # Determine padding color (use enhanced image for smart padding)
-        if smart_pad_color:
-            actual_pad_color = get_smart_pad_color(img, pad_color_method)
+        if not (pad_top or pad_bottom or pad_left or pad_right):
+            # Ảnh đã lấp đầy khung (cùng tỉ lệ): bỏ qua dò màu và bản sao viền
+            padded = resized
         else:
-            actual_pad_color = pad_color
-
-        padded = cv2.copyMakeBorder(
-            resized,
-            pad_top,
-            pad_bottom,
-            pad_left,
-            pad_right,
-            borderType=cv2.BORDER_CONSTANT,
-            value=actual_pad_color,
-        )
-
-        processed.append(padded)
+            # Determine padding color (use enhanced image for smart padding)
+            if smart_pad_color:
+                actual_pad_color = get_smart_pad_color(img, pad_color_method)
+            else:
+                actual_pad_color = pad_color
+
+            padded = cv2.copyMakeBorder(
+                resized,
+                pad_top,
+                pad_bottom,
+                pad_left,
+                pad_right,
+                borderType=cv2.BORDER_CONSTANT,
+                value=actual_pad_color,
+            )
 
         # Save processed image if output_dir is provided
-        if output_dir and not return_arrays:
-            os.makedirs(output_dir, exist_ok=True)
-
-            # Generate output filename
-            original_name = os.path.basename(path)
-            name_without_ext = os.path.splitext(original_name)[0]
-            processed_filename = f"processed_{name_without_ext}.jpg"
-            processed_path = os.path.join(output_dir, processed_filename)
-
-            # Save the processed image
-            cv2.imwrite(processed_path, padded)
+        if save_to_dir:
+            # Write under a unique name and rename into place, so a concurrent
+            # render reusing this file never reads a partial image
+            partial_path = f"{processed_path}.{uuid.uuid4().hex}.bmp"
+            cv2.imwrite(partial_path, padded)
+            os.replace(partial_path, processed_path)
             processed_paths.append(processed_path)
+        else:
+            # Arrays are only kept when they are returned
+            processed.append(padded)
 
     # Return based on what was requested
-    if output_dir and not return_arrays:
+    if save_to_dir:
         return processed_paths
     else:
         return processed
@@ -253,9 +313,10 @@ def auto_enhance_image(
             brightness_adjustment = target_brightness - mean_brightness
 
             # Apply brightness adjustment with clipping
-            l_channel = np.clip(l_channel + brightness_adjustment * 0.3, 0, 255).astype(
-                np.uint8
-            )
+            brightness_lut = np.clip(
+                _IDENTITY_LEVELS + brightness_adjustment * 0.3, 0, 255
+            ).astype(np.uint8)
+            l_channel = cv2.LUT(l_channel, brightness_lut)
 
         if enhance_contrast:
             # Apply CLAHE (Contrast Limited Adaptive Histogram Equalization)
@@ -276,18 +337,16 @@ def auto_enhance_image(
 
         # Auto adjust saturation if image is too dull
         if mean_saturation < 100:  # Low saturation threshold
-            saturation_factor = 1.2  # Increase saturation by 20%
-            hsv[:, :, 1] = np.clip(saturation * saturation_factor, 0, 255).astype(
-                np.uint8
-            )
+            # Increase saturation by 20%
+            hsv[:, :, 1] = cv2.LUT(saturation, _SATURATION_BOOST_LUT)
 
         enhanced = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
 
     if enhance_sharpness:
         # Apply unsharp masking for sharpness enhancement
         gaussian = cv2.GaussianBlur(enhanced, (5, 5), 0)
+        # addWeighted saturates uint8 output, so no separate clip is needed
         enhanced = cv2.addWeighted(enhanced, 1.5, gaussian, -0.5, 0)
-        enhanced = np.clip(enhanced, 0, 255).astype(np.uint8)
 
     return enhanced
 
@@ -367,7 +426,7 @@ def search_pixabay_image(
     }
 
     try:
-        resp = requests.get(url, params=params, timeout=10)
+        resp = _PIXABAY_SESSION.get(url, params=params, timeout=10)
         resp.raise_for_status()
         data = resp.json()
         hits = data.get("hits", [])
@@ -397,7 +456,7 @@ def search_pixabay_image(
         if not hits:
             params.pop("min_width", None)
             params.pop("min_height", None)
-            resp = requests.get(url, params=params, timeout=10)
+            resp = _PIXABAY_SESSION.get(url, params=params, timeout=10)
             resp.raise_for_status()
             data = resp.json()
             hits = data.get("hits", [])
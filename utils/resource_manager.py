@@ -3,7 +3,6 @@ Resource management utilities for video processing
 """
 
 import os
-import gc
 import time
 import logging
 import shutil
@@ -11,11 +10,20 @@ import uuid
 import asyncio
 import threading
 from contextlib import contextmanager, asynccontextmanager
-from typing import List, Optional, AsyncIterator
+from typing import List, Optional, AsyncIterator, Set
 from app.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Number of directory entries scanned between progress log lines
+_CLEANUP_SCAN_BATCH_SIZE = 256
+
+# Directory that job temp directories are created in (and scanned for leftovers)
+_TEMP_ROOT = "data"
+
+# Background temp directory removals still running (keeps the tasks referenced)
+_pending_removals: Set[asyncio.Task] = set()
+
 
 class ResourceManager:
     """Manages file resources and cleanup operations"""
@@ -44,9 +52,6 @@ class ResourceManager:
         """Clean up all tracked resources"""
         self.cleanup_files()
 
-        if settings.performance_gc_enabled:
-            gc.collect()
-
     def _schedule_delayed_cleanup(
         self, path: str, delay_seconds: Optional[float] = None
     ):
@@ -87,35 +92,43 @@ async def managed_temp_directory(prefix: Optional[str] = None) -> AsyncIterator[
     """Async context manager for temporary directory with automatic cleanup"""
 
     if prefix is None:
-        prefix = os.path.join("data", settings.temp_dir_prefix)
+        prefix = os.path.join(_TEMP_ROOT, settings.temp_dir_prefix)
 
     temp_dir = f"{prefix}{uuid.uuid4().hex}"
-    os.makedirs(temp_dir, exist_ok=True)
+    # Tạo và xoá thư mục đều chạy ngoài event loop (filesystem chậm/mạng)
+    await asyncio.to_thread(os.makedirs, temp_dir, exist_ok=True)
 
     try:
         yield temp_dir
     finally:
-        await _cleanup_temp_directory_async(temp_dir)
-
+        _schedule_temp_directory_removal(temp_dir)
 
-async def _cleanup_temp_directory_async(temp_dir: str):
-    """Async cleanup for temporary directories with retries"""
 
+def _remove_temp_directory(temp_dir: str) -> None:
+    """Remove a temporary directory, falling back to delayed cleanup on failure"""
     try:
-        if not os.path.exists(temp_dir):
-            return
-
-        # Force garbage collection
-        if settings.performance_gc_enabled:
-            gc.collect()
-            await asyncio.sleep(settings.performance_file_handle_delay)
-
-        # Non-Windows systems
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        shutil.rmtree(temp_dir)
         logger.info("✅ Cleaned up temporary directory: %s", temp_dir)
-
+    except FileNotFoundError:
+        return
     except (OSError, PermissionError, shutil.Error) as e:
         logger.warning("❌ Failed to clean up temp directory %s: %s", temp_dir, str(e))
+        ResourceManager()._schedule_delayed_cleanup(temp_dir)
+
+
+def _schedule_temp_directory_removal(temp_dir: str) -> None:
+    """Remove a job's temporary directory in the background.
+
+    Mọi tiến trình ffmpeg/ffprobe đều đã kết thúc (subprocess.run chờ xong)
+    trước khi tới đây, nên không cần gc.collect() + sleep để chờ đóng handle.
+    Việc xoá chạy nền trong thread pool, không giữ response chờ rmtree (hàng
+    nghìn file tạm); nếu thất bại (ví dụ file còn bị khoá trên Windows) thì
+    chuyển sang dọn dẹp trễ ở background thread. Thư mục không còn tồn tại
+    được bỏ qua ngay trong thread đó (không stat trên event loop).
+    """
+    task = asyncio.create_task(asyncio.to_thread(_remove_temp_directory, temp_dir))
+    _pending_removals.add(task)
+    task.add_done_callback(_pending_removals.discard)
 
 
 def cleanup_old_temp_directories(
@@ -131,11 +144,25 @@ def cleanup_old_temp_directories(
         current_time = time.time()
         max_age_seconds = max_age_hours * 3600
 
-        for item in os.listdir("."):
-            if os.path.isdir(item) and item.startswith(base_pattern):
+        # os.scandir yields entries lazily and caches their type information,
+        # avoiding the full name list and extra stat calls of os.listdir.
+        # Scan where managed_temp_directory creates job directories
+        with os.scandir(_TEMP_ROOT) as entries:
+            for scanned, entry in enumerate(entries, 1):
+                if scanned % _CLEANUP_SCAN_BATCH_SIZE == 0:
+                    logger.debug("🧹 Scanned %d entries for old temp directories", scanned)
+
+                if not entry.name.startswith(base_pattern):
+                    continue
+                item = entry.path
                 try:
-                    dir_mtime = os.path.getmtime(item)
-                    age_seconds = current_time - dir_mtime
+                    # Only real directories: a matching symlink would be
+                    # stat'ed through, and rmtree refuses symlinks anyway
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    age_seconds = (
+                        current_time - entry.stat(follow_symlinks=False).st_mtime
+                    )
 
                     if age_seconds > max_age_seconds:
                         logger.info(
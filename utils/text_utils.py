@@ -8,10 +8,13 @@ xử lý duration và các thao tác liên quan đến hiển thị văn bản.
 
 from typing import Annotated, Dict, List, Optional
 import asyncio
+import hashlib
 import json
 import logging
+import os
 import re
 import time
+import uuid
 
 from pydantic_ai import Agent
 from pydantic import BaseModel, field_validator
@@ -152,6 +155,80 @@ class TranscriptSegments(BaseModel):
     ]
 
 
+def _split_cache_path(content: str) -> str:
+    """Đường dẫn cache cho kết quả phân đoạn (sha256 của model + transcript)"""
+    key = hashlib.sha256(
+        f"{settings.ai_pydantic_model}|{content}".encode("utf-8")
+    ).hexdigest()
+    return os.path.join(settings.transcript_split_cache_dir, f"{key}.json")
+
+
+def _load_cached_split(content: str) -> Optional[List[str]]:
+    """Đọc kết quả phân đoạn đã lưu, None nếu chưa có hoặc không đọc được"""
+    try:
+        with open(_split_cache_path(content), "r", encoding="utf-8") as f:
+            segments = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if isinstance(segments, list) and all(isinstance(s, str) for s in segments):
+        # Cập nhật mtime: janitor chỉ xoá các mục lâu không được dùng
+        try:
+            os.utime(_split_cache_path(content))
+        except OSError:
+            pass
+        return segments
+    return None
+
+
+def _store_cached_split(content: str, segments: List[str]) -> None:
+    """Lưu kết quả phân đoạn; ghi file tạm rồi os.replace để không ai đọc file dở"""
+    cache_path = _split_cache_path(content)
+    partial_path = f"{cache_path}.{uuid.uuid4().hex}.part"
+    try:
+        os.makedirs(settings.transcript_split_cache_dir, exist_ok=True)
+        with open(partial_path, "w", encoding="utf-8") as f:
+            json.dump(segments, f, ensure_ascii=False)
+        os.replace(partial_path, cache_path)
+    except OSError as e:
+        logger.warning("Không thể lưu cache phân đoạn transcript: %s", e)
+        try:
+            os.remove(partial_path)
+        except OSError:
+            pass
+
+
+def prune_transcript_split_cache() -> None:
+    """Xoá các kết quả phân đoạn lâu không được dùng (và file .part bị bỏ dở)"""
+    now = time.time()
+    max_age = settings.transcript_split_cache_max_age_days * 86400
+    # File .part chỉ tồn tại trong lúc ghi một file JSON nhỏ
+    partial_max_age = settings.temp_cleanup_age_hours * 3600
+    removed = 0
+    try:
+        with os.scandir(settings.transcript_split_cache_dir) as entries:
+            for entry in entries:
+                try:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    age = now - entry.stat(follow_symlinks=False).st_mtime
+                    limit = (
+                        partial_max_age if entry.name.endswith(".part") else max_age
+                    )
+                    if age > limit:
+                        os.remove(entry.path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    logger.warning(
+                        "Không thể xoá cache phân đoạn %s: %s", entry.path, e
+                    )
+    except FileNotFoundError:
+        return
+    if removed:
+        logger.info("Removed %d expired transcript split cache entries", removed)
+
+
 async def split_transcript(content: str) -> List[str]:
     """Split transcript into natural segments using LLM.
 
@@ -166,6 +243,13 @@ async def split_transcript(content: str) -> List[str]:
     """
     start_time = time.time()
 
+    # Cùng transcript (và cùng model) cho cùng kết quả: dùng lại lần gọi LLM trước
+    if settings.transcript_split_cache_enabled:
+        cached = await asyncio.to_thread(_load_cached_split, content)
+        if cached is not None:
+            logger.debug("Transcript split cache hit (%d segments)", len(cached))
+            return cached
+
     try:
 
         async def run_async():
@@ -253,6 +337,10 @@ async def split_transcript(content: str) -> List[str]:
             len(transcript_segments.segments),
         )
 
+        if settings.transcript_split_cache_enabled:
+            await asyncio.to_thread(
+                _store_cached_split, content, transcript_segments.segments
+            )
         return transcript_segments.segments
 
     except (json.JSONDecodeError, ValidationError) as e:
@@ -5,19 +5,239 @@ This module provides functions for video processing tasks such as concatenation,
 transitions, and audio mixing using FFmpeg.
 """
 
+import asyncio
+import functools
 import json
+import logging
 import os
 import re
 import shutil
+import subprocess
+import threading
 from typing import List, Optional, Dict, Any
 
+from app.config.settings import settings
+from utils.audio_utils import read_wav_duration
 from utils.subprocess_utils import safe_subprocess_run, SubprocessError
 
+_logger = logging.getLogger(__name__)
+
+# NVENC rate control roughly matching libx264's default quality
+_NVENC_ENCODER_ARGS = ("-c:v", "h264_nvenc", "-preset", "p4", "-rc", "vbr", "-cq", "23")
+# Segment clips carry lossless FLAC audio (MKV); the only lossy audio encode happens
+# when the final MP4 is written
+_FINAL_AUDIO_ARGS = ("-c:a", settings.video_default_audio_codec, "-b:a", "192k")
+_MEAN_VOLUME_RE = re.compile(
+    r"\[Parsed_volumedetect_(\d+) @ [^\]]+\] mean_volume:\s*(-?\d+(?:\.\d+)?) dB"
+)
+# The final MP4 is served from S3: put the moov atom first so players can
+# start before the whole file has been fetched
+_FINAL_MUX_ARGS = ("-movflags", "+faststart")
+# Upper bound for one metadata-only ffprobe run
+_PROBE_TIMEOUT_SECONDS = 10.0
+# NVDEC decode that leaves frames in GPU memory for scale_cuda/NVENC
+_CUDA_FRAME_ARGS = ("-hwaccel", "cuda", "-hwaccel_output_format", "cuda")
+_SCALE_CUDA_RE = re.compile(r"scale_cuda=(\d+):(\d+):format=(\w+)")
+# Segment renders run in worker threads; consumer GPUs reject NVENC sessions
+# beyond a small limit, so hardware encodes wait for a free slot instead
+_NVENC_SESSIONS = threading.BoundedSemaphore(max(1, settings.video_hw_max_sessions))
+
 
 class VideoProcessingError(SubprocessError):
     """Custom exception for video processing errors."""
 
 
+@functools.lru_cache(maxsize=1)
+def _nvenc_available() -> bool:
+    """Check that h264_nvenc can actually encode (driver + GPU present).
+
+    The probe (and its log line) runs once per process.
+    """
+    probe_cmd = [
+        settings.ffmpeg_binary_path,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-f",
+        "lavfi",
+        "-i",
+        "color=c=black:s=256x256:d=0.1",
+        "-c:v",
+        "h264_nvenc",
+        "-f",
+        "null",
+        "-",
+    ]
+    try:
+        result = subprocess.run(
+            probe_cmd, capture_output=True, timeout=15, check=False
+        )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    if result.returncode != 0:
+        return False
+    _logger.info("Using h264_nvenc hardware encoder")
+    return True
+
+
+def get_video_encoder_args() -> List[str]:
+    """
+    Return the ffmpeg video encoder arguments for H.264 output.
+
+    Prefers the NVENC hardware encoder when enabled and usable, otherwise
+    settings.video_default_codec. The NVENC probe runs once per process.
+    """
+    if settings.video_hw_encoding_enabled and _nvenc_available():
+        return list(_NVENC_ENCODER_ARGS)
+    return ["-c:v", settings.video_default_codec]
+
+
+def get_video_decoder_args() -> List[str]:
+    """
+    Return ffmpeg input options for decoding video inputs.
+
+    When encoding on NVENC, inputs are decoded on NVDEC as well; ffmpeg falls
+    back to software decoding by itself for codecs the GPU cannot decode.
+    """
+    if get_video_encoder_args()[1] == "h264_nvenc":
+        return ["-hwaccel", "cuda"]
+    return []
+
+
+def get_gpu_scale_args(width: int, height: int) -> Optional[Dict[str, List[str]]]:
+    """
+    Return ffmpeg arguments that keep decoded frames in GPU memory from
+    NVDEC through scale_cuda to NVENC, or None when NVENC is not in use.
+
+    Only usable when the video filter chain is a plain scale to yuv420p:
+    CPU filters (fade, drawtext) cannot read CUDA frames.
+
+    Returns:
+        {"input": decoder options, "filter": the -vf value}
+    """
+    if get_video_encoder_args()[1] != "h264_nvenc":
+        return None
+    return {
+        "input": list(_CUDA_FRAME_ARGS),
+        "filter": f"scale_cuda={width}:{height}:format=yuv420p",
+    }
+
+
+def with_software_encoder(cmd: List[str]) -> List[str]:
+    """
+    Rewrite an ffmpeg command built with the NVENC arguments to use the
+    software encoder (and software decoding/scaling) instead.
+
+    Used to retry an encode when NVENC fails at runtime, e.g. because the
+    GPU's concurrent session limit is reached.
+    """
+    nvenc_len = len(_NVENC_ENCODER_ARGS)
+    cuda_len = len(_CUDA_FRAME_ARGS)
+    result: List[str] = []
+    i = 0
+    while i < len(cmd):
+        if tuple(cmd[i : i + nvenc_len]) == _NVENC_ENCODER_ARGS:
+            result += ["-c:v", settings.video_default_codec]
+            i += nvenc_len
+        elif tuple(cmd[i : i + cuda_len]) == _CUDA_FRAME_ARGS:
+            i += cuda_len
+        elif cmd[i : i + 2] == ["-hwaccel", "cuda"]:
+            i += 2
+        else:
+            match = _SCALE_CUDA_RE.fullmatch(cmd[i])
+            if match:
+                width, height, pix_fmt = match.groups()
+                result.append(f"scale={width}:{height},format={pix_fmt}")
+            else:
+                result.append(cmd[i])
+            i += 1
+    return result
+
+
+def run_encode(cmd: List[str], operation_name: str, logger: Any) -> str:
+    """
+    Run an ffmpeg encode, retrying once with the software encoder if the
+    NVENC encode fails. At most settings.video_hw_max_sessions NVENC
+    encodes run at once.
+
+    Returns:
+        The video encoder that produced the output (value of -c:v)
+    """
+    try:
+        if "h264_nvenc" in cmd:
+            with _NVENC_SESSIONS:
+                safe_subprocess_run(cmd, operation_name, logger)
+        else:
+            safe_subprocess_run(cmd, operation_name, logger)
+    except SubprocessError as e:
+        if "h264_nvenc" not in cmd:
+            raise
+        logger.warning(
+            "%s failed with h264_nvenc, retrying with %s: %s",
+            operation_name,
+            settings.video_default_codec,
+            e.message,
+        )
+        cmd = with_software_encoder(cmd)
+        safe_subprocess_run(cmd, operation_name, logger)
+    return cmd[cmd.index("-c:v") + 1]
+
+
+async def probe_duration_async(path: str) -> Optional[float]:
+    """
+    Probe a media file's duration with a non-blocking ffprobe subprocess.
+
+    Returns:
+        Duration in seconds, or None if ffprobe fails or reports no duration
+    """
+    # PCM WAV (typical TTS voice over): the header alone gives the duration
+    duration = read_wav_duration(path)
+    if duration is not None:
+        return duration
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "ffprobe",
+            "-v",
+            "quiet",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "csv=p=0",
+            path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError as e:
+        _logger.warning("Could not run ffprobe for %s: %s", path, e)
+        return None
+    try:
+        # Reading container metadata takes milliseconds; a probe stuck on a
+        # damaged file must not hold up the whole download stage
+        stdout, _ = await asyncio.wait_for(
+            process.communicate(), timeout=_PROBE_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        _logger.warning("ffprobe timed out for %s", path)
+        return None
+    except asyncio.CancelledError:
+        # Cancelling communicate() leaves the child running
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+        await process.wait()
+        raise
+    if process.returncode != 0:
+        return None
+    try:
+        return float(stdout.decode().strip())
+    except ValueError:
+        return None
+
+
 def ffmpeg_concat_videos(
     video_segments: List[Dict[str, str]],
     output_path: str,
@@ -63,50 +283,58 @@ def ffmpeg_concat_videos(
                 logger.error(error_msg)
             raise VideoProcessingError(error_msg) from e
 
-    def get_mean_volume(audio_path):
+    def get_mean_volumes(*inputs: List[str]) -> List[Optional[float]]:
+        """Mean volume (dB) of each input's audio, measured in one ffmpeg run"""
+        input_args = [arg for args in inputs for arg in args]
+        filter_complex = ";".join(
+            f"[{i}:a]volumedetect[vd{i}]" for i in range(len(inputs))
+        )
+        map_args = [arg for i in range(len(inputs)) for arg in ("-map", f"[vd{i}]")]
         cmd = [
             "ffmpeg",
-            "-i",
-            audio_path,
-            "-af",
-            "volumedetect",
-            "-vn",
-            "-sn",
-            "-dn",
+            *input_args,
+            "-filter_complex",
+            filter_complex,
+            *map_args,
             "-f",
             "null",
             "NUL" if os.name == "nt" else "/dev/null",
         ]
+        volumes: List[Optional[float]] = [None] * len(inputs)
         try:
-            result = safe_subprocess_run(
-                cmd, f"Get mean volume for {audio_path}", logger
-            )
+            result = safe_subprocess_run(cmd, "Get mean volumes", logger)
             if not result or not result.stderr:
-                return None
-            match = re.search(r"mean_volume:\s*(-?\d+(\.\d+)?) dB", result.stderr)
-            if match:
-                return float(match.group(1))
-            return None
+                return volumes
+            # Each volumedetect instance reports under its own name
+            # (Parsed_volumedetect_<index in the graph>)
+            for match in _MEAN_VOLUME_RE.finditer(result.stderr):
+                index = int(match.group(1))
+                if index < len(volumes):
+                    volumes[index] = float(match.group(2))
+            return volumes
         except (OSError, SubprocessError, ValueError) as e:
             if logger:
-                logger.warning(f"Failed to get mean volume for {audio_path}: {e}")
-            return None
+                logger.warning(f"Failed to get mean volumes: {e}")
+            return volumes
 
-    def validate_inputs():
-        """Validate input parameters"""
+    def validate_inputs() -> List[str]:
+        """Validate input parameters and return the concat list lines"""
         if not video_segments:
             raise VideoProcessingError("video_segments cannot be empty")
 
-        if len(video_segments) < 1:
-            raise VideoProcessingError("At least 1 video segment is required")
-
+        # Clip renderers always produce {"id", "path"} dicts; validate and
+        # build the concat list in the same pass
+        concat_lines = []
         for i, seg in enumerate(video_segments):
-            if not isinstance(seg, dict):
-                raise VideoProcessingError(f"Segment {i} must be a dictionary")
-            if "path" not in seg:
-                raise VideoProcessingError(f"Segment {i} missing 'path' field")
-            if not os.path.exists(seg["path"]):
-                raise VideoProcessingError(f"Video file not found: {seg['path']}")
+            try:
+                path = seg["path"]
+            except (TypeError, KeyError):
+                raise VideoProcessingError(
+                    f"Segment {i} must be a dictionary with a 'path' field"
+                ) from None
+            if not os.path.exists(path):
+                raise VideoProcessingError(f"Video file not found: {path}")
+            concat_lines.append(_concat_list_line(path))
 
         # Validate output directory exists and is writable
         output_dir = os.path.dirname(output_path)
@@ -125,43 +353,117 @@ def ffmpeg_concat_videos(
                 error_msg = f"Cannot write to output directory {output_dir}: {e}"
                 raise VideoProcessingError(error_msg) from e
 
+        return concat_lines
+
     # Validate inputs before processing
-    validate_inputs()
+    concat_lines = validate_inputs()
 
     # 1. Concat segments
     concat_list_path = os.path.join(temp_dir, "concat_list.txt")
     with open(concat_list_path, "w", encoding="utf-8") as f:
-        for seg in video_segments:
-            f.write(f"file '{os.path.abspath(seg['path'])}'\n")
-    temp_path = os.path.join(temp_dir, "concat_output.mp4")
-    ffmpeg_cmd = [
-        "ffmpeg",
-        "-y",
-        "-threads",
-        "1",
-        "-f",
-        "concat",
-        "-safe",
-        "0",
-        "-i",
-        concat_list_path,
-        "-c",
-        "copy",
-        temp_path,
-    ]
-    safe_subprocess_run(ffmpeg_cmd, "Concat without transition", logger)
-    if logger:
-        logger.info(f"Final video concat: {temp_path}")
+        f.write("".join(concat_lines))
+    concat_input = ["-f", "concat", "-safe", "0", "-i", concat_list_path]
+    bgm_path = (background_music or {}).get("local_path")
+    # The last ffmpeg pass writes next to output_path, so publishing the
+    # video is a rename within one directory even when temp_dir and the
+    # output directory are on different filesystems (no full-file copy)
+    output_root, output_ext = os.path.splitext(output_path)
+    staging_path = f"{output_root}.part{output_ext}"
+    # Without music the concat is that last pass. With music it is only the
+    # mix input, but it is still written next to output_path so that the
+    # too-short-BGM fallback publishes it by rename as well
+    temp_path = (
+        f"{output_root}.concat.part{output_ext}" if bgm_path else staging_path
+    )
+    # Stream copy needs every clip to come from the same encoder (same
+    # SPS/PPS); clips whose NVENC encode fell back to libx264 get the video
+    # re-encoded once here instead (on NVENC when available, see run_encode)
+    mixed_encoders = (
+        len({seg.get("encoder") for seg in video_segments} - {None}) > 1
+    )
+    if mixed_encoders:
+        if logger:
+            logger.warning(
+                "Segments were encoded with different encoders, "
+                "re-encoding video during concat"
+            )
+        video_codec_args = [*get_video_encoder_args(), "-pix_fmt", "yuv420p"]
+    else:
+        video_codec_args = ["-c:v", "copy"]
+
+    def write_concat_output() -> None:
+        ffmpeg_cmd = [
+            "ffmpeg",
+            "-y",
+            *_copy_thread_args(video_codec_args),
+            *concat_input,
+            *video_codec_args,
+            *_FINAL_AUDIO_ARGS,
+            *_FINAL_MUX_ARGS,
+            temp_path,
+        ]
+        _run_to_file(ffmpeg_cmd, temp_path, "Concat without transition", logger)
+        if logger:
+            logger.info(f"Final video concat: {temp_path}")
+
+    # Clip renderers report their durations; sum them rather than
+    # probing the joined file (ffprobe only for older/foreign inputs)
+    clip_durations = [seg.get("duration") for seg in video_segments]
+    durations_known = all(isinstance(d, (int, float)) for d in clip_durations)
+
+    if bgm_path and durations_known:
+        # The BGM pass reads the segments through the concat demuxer
+        # directly, so the joined video is only written once (and, with
+        # mixed encoders, re-encoded in that same pass)
+        source_input = concat_input
+        video_duration = float(sum(clip_durations))
+    else:
+        write_concat_output()
+        source_input = ["-i", temp_path]
+        if bgm_path:
+            try:
+                video_duration = get_duration(temp_path)
+            except VideoProcessingError:
+                _discard_file(temp_path)
+                raise
 
     # 2. Overlay background music if provided
-    if background_music and background_music.get("local_path"):
-        bgm_path = background_music.get("local_path")
+    if bgm_path:
         start_delay = float(background_music.get("start_delay", 0) or 0)
-        video_duration = get_duration(temp_path)
+        # Calculate actual BGM play duration considering both start_delay and end_delay
+        end_delay = float(background_music.get("end_delay", 0) or 0)
+        bgm_start_time = start_delay
+        bgm_end_time = max(0, video_duration - end_delay)
+        bgm_play_duration = max(0, bgm_end_time - bgm_start_time)
+
+        if logger:
+            logger.info(
+                f"🎵 BGM timing: video_duration={video_duration:.2f}s, "
+                f"start_delay={start_delay:.2f}s, end_delay={end_delay:.2f}s, "
+                f"bgm_play_duration={bgm_play_duration:.2f}s"
+            )
+
+        # Safety check: if BGM duration is too small or invalid, skip BGM processing
+        if bgm_play_duration <= 0.1:  # Less than 100ms
+            if logger:
+                logger.warning(
+                    f"⚠️ BGM play duration too short ({bgm_play_duration:.2f}s), "
+                    "skipping background music"
+                )
+            # Move the plain concat to output without BGM processing
+            if source_input is concat_input:
+                temp_path = staging_path
+                write_concat_output()
+            _move_to_output(temp_path, output_path)
+            return
+
         # Auto adjust bgm volume based on mean_volume
         try:
-            video_mean_volume = get_mean_volume(temp_path)
-            music_mean_volume = get_mean_volume(bgm_path)
+            # Both inputs are decoded side by side in a single ffmpeg process;
+            # only the part of the music that is actually played is measured
+            video_mean_volume, music_mean_volume = get_mean_volumes(
+                source_input, ["-t", f"{bgm_play_duration:.3f}", "-i", bgm_path]
+            )
             if video_mean_volume is not None and music_mean_volume is not None:
                 diff_db = video_mean_volume - music_mean_volume
                 bgm_volume_factor = 10 ** (diff_db / 20)
@@ -185,33 +487,8 @@ def ffmpeg_concat_videos(
                 logger.warning(
                     f"⚠️ Error auto-adjusting bgm volume: {e}, using default 0.2"
                 )
+
         # Prepare filter for bgm: delay, trim, volume
-        # Calculate actual BGM play duration considering both start_delay and end_delay
-        end_delay = float(background_music.get("end_delay", 0) or 0)
-        bgm_start_time = start_delay
-        bgm_end_time = max(0, video_duration - end_delay)
-        bgm_play_duration = max(0, bgm_end_time - bgm_start_time)
-        
-        if logger:
-            logger.info(
-                f"🎵 BGM timing: video_duration={video_duration:.2f}s, "
-                f"start_delay={start_delay:.2f}s, end_delay={end_delay:.2f}s, "
-                f"bgm_play_duration={bgm_play_duration:.2f}s"
-            )
-        
-        # Safety check: if BGM duration is too small or invalid, skip BGM processing
-        if bgm_play_duration <= 0.1:  # Less than 100ms
-            if logger:
-                logger.warning(
-                    f"⚠️ BGM play duration too short ({bgm_play_duration:.2f}s), "
-                    "skipping background music"
-                )
-            # Copy temp_path to output without BGM processing
-            if os.path.exists(output_path):
-                raise VideoProcessingError(f"Output file already exists: {output_path}")
-            shutil.copy2(temp_path, output_path)
-            return
-        
         filter_parts = []
         if start_delay > 0:
             delay_ms = int(start_delay * 1000)
@@ -228,14 +505,18 @@ def ffmpeg_concat_videos(
             f"[1:a]{bgm_filter}[bgm]; "
             f"[0:a][bgm]amix=inputs=2:duration=shortest:dropout_transition=2[aout]"
         )
-        temp_final_with_bgm = os.path.join(temp_dir, "final_with_bgm.mp4")
+        temp_final_with_bgm = staging_path
+        # Only the audio changes here; the concatenated H.264 stream (already
+        # yuv420p) is copied instead of decoded and re-encoded, unless segments
+        # from different encoders are read straight from the concat demuxer
+        mix_video_args = (
+            video_codec_args if source_input is concat_input else ["-c:v", "copy"]
+        )
         ffmpeg_mix_cmd = [
             "ffmpeg",
             "-y",
-            "-threads",
-            "1",
-            "-i",
-            temp_path,
+            *_copy_thread_args(mix_video_args),
+            *source_input,
             "-i",
             bgm_path,
             "-filter_complex",
@@ -244,24 +525,77 @@ def ffmpeg_concat_videos(
             "0:v",
             "-map",
             "[aout]",
-            "-c:v",
-            "libx264",
-            "-profile:v",
-            "high",
-            "-pix_fmt",
-            "yuv420p",
-            "-c:a",
-            "aac",
+            *mix_video_args,
+            *_FINAL_AUDIO_ARGS,
             "-shortest",
+            *_FINAL_MUX_ARGS,
             temp_final_with_bgm,
         ]
         if logger:
             logger.info(f"Mixing BGM (atomic operation): {' '.join(ffmpeg_mix_cmd)}")
-        safe_subprocess_run(ffmpeg_mix_cmd, "Background music mixing", logger)
+        try:
+            _run_to_file(
+                ffmpeg_mix_cmd, temp_final_with_bgm, "Background music mixing", logger
+            )
+        finally:
+            if source_input is not concat_input:
+                # The joined video was only the input of the mix
+                _discard_file(temp_path)
         # Final output is temp_final_with_bgm
         temp_path = temp_final_with_bgm
 
-    # 3. Copy final result to output_path (do not overwrite if exists)
+    # 3. Move final result to output_path (do not overwrite if exists)
+    _move_to_output(temp_path, output_path)
+
+
+def _copy_thread_args(video_codec_args: List[str]) -> List[str]:
+    """
+    Single-thread a pass only when it stream-copies the video: it then just
+    remuxes (and encodes audio), while a video re-encode needs every core
+    """
+    if video_codec_args == ["-c:v", "copy"]:
+        return ["-threads", "1"]
+    return []
+
+
+def _concat_list_line(path: str) -> str:
+    """Concat demuxer list entry for a file.
+
+    Quotes inside a quoted path cannot be escaped, so each ' closes the
+    quoting, is escaped on its own and reopens it ('\\'').
+    """
+    quoted = os.path.abspath(path).replace("'", "'\\''")
+    return f"file '{quoted}'\n"
+
+
+def _run_to_file(
+    cmd: List[str], dest_path: str, operation_name: str, logger: Optional[Any]
+) -> None:
+    """Run an encode writing dest_path, removing the partial file if it fails"""
+    try:
+        run_encode(cmd, operation_name, logger or _logger)
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+
+
+def _discard_file(path: str) -> None:
+    """Remove an intermediate file if it is still there"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _move_to_output(src_path: str, output_path: str) -> None:
+    """Move the finished video to output_path without rewriting it.
+
+    On the same filesystem this is a rename (no data copied); shutil.move
+    only falls back to copy + delete when the destination is on another device.
+    """
     if os.path.exists(output_path):
+        # Do not leave the unpublished copy behind (it may sit in the output dir)
+        os.remove(src_path)
         raise VideoProcessingError(f"Output file already exists: {output_path}")
-    shutil.copy2(temp_path, output_path)
+    shutil.move(src_path, output_path)